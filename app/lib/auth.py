@@ -1,6 +1,7 @@
 import jwt
 import hashlib
 
+from uuid import uuid4
 from datetime import datetime, timedelta, timezone
 from fastapi import Request, Response
 from tortoise.exceptions import IntegrityError, OperationalError
@@ -156,6 +157,8 @@ def create_refresh_token(user: User) -> str:
     to_encode = {
         "sub": str(user.id),
         "exp": expire,
+        # Unique token ID so tokens issued in the same second hash differently
+        "jti": uuid4().hex,
     }
     encoded_jwt = jwt.encode(to_encode,
                              config.auth_token_secret_key,
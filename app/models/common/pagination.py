@@ -1,16 +1,20 @@
 from math import ceil
-from pydantic import BaseModel 
-from typing import TYPE_CHECKING, Any
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Annotated, Any
 from tortoise.queryset import Q, QuerySet
 
 from app.models.common.base import _ModelBase
 
 
+# Upper bound on page_size, which also bounds the IN (...) list of any per-page prefetch
+MAX_PAGE_SIZE = 100
+
+
 class PaginationParams(BaseModel):
     """Default pagination parameters."""
 
-    page: int = 1
-    page_size: int = 10
+    page: Annotated[int, Field(ge=1)] = 1
+    page_size: Annotated[int, Field(ge=1, le=MAX_PAGE_SIZE)] = 10
     sort_order: str = "asc"
     sort_by: str = "id"
 
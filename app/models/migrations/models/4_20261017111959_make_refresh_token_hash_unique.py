@@ -0,0 +1,57 @@
+from tortoise import BaseDBAsyncClient
+
+RUN_IN_TRANSACTION = True
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Collapse rows sharing a token_hash to one before adding the unique
+    # index, keeping a revoked copy if there is one so no revocation is lost.
+    return """
+        DELETE `t1` FROM `refresh_tokens` `t1`
+            INNER JOIN `refresh_tokens` `t2`
+                ON `t1`.`token_hash` = `t2`.`token_hash`
+                AND (`t1`.`revoked` < `t2`.`revoked`
+                    OR (`t1`.`revoked` = `t2`.`revoked` AND `t1`.`id` > `t2`.`id`));
+        ALTER TABLE `refresh_tokens` DROP INDEX `idx_refresh_tok_token_h_e92003`, ADD UNIQUE (`token_hash`);"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE `refresh_tokens` DROP INDEX `token_hash`, ADD INDEX `idx_refresh_tok_token_h_e92003` (`token_hash`);"""
+
+
+MODELS_STATE = (
+    "eJztnW1T2zgQgP+KJ5+4Ga5DQko79y1JYZq2wE0I15t2Oh7FVhINjuTKCoHr5L+f5PcX2d"
+    "ghLjbRp1Jp15GelaXd1RJ+dVbEhJbzZrwCC9j5S/vVwWAlfkh2HGsdYNtRs2hgYGa5kkiI"
+    "uE1g5jAKDMZb58ByIG8yoWNQZDNEMG/Fa8sSjcTggggvoqY1Rj/XUGdkAdkSUt7x/QdvRt"
+    "iED/zh/n/tO32OoGUmRopM8dluu84ebbdtjNmFKyg+baYbxFqvcCRsP7IlwaE0wky0LiCG"
+    "FDAoHs/oWgxfjM6fZzAjb6SRiDfEmI4J52Btsdh0SzIwCBb8+Ggcd4KuRf7sdfvv+u9Pz/"
+    "rvuYg7krDl3dabXjR3T9ElcDXtbN1+wIAn4WKMuBkUisnqgGX5feA9DK2gHGJSMwXT9FXf"
+    "BD+k0QYgi9gGDRHcaEHtiS6fg3mNrUffcAUop+PL85vp4PJvMZOV4/y0XESD6bno6bmtj6"
+    "nWo7M/RDvhr4P3loQP0b6Opx818V/t2/XVuUuQOGxB3U+M5KbfOmJMYM2IjslGB2ZsjQWt"
+    "ARguGRl2bZs7GjapqQz7oob1Bx/Z1TVExqKjJaByawbyKTtyWA213Ao86BbEC7YUu9zbtw"
+    "Wm+2cwGX0cTI64VMoeV35Xz+vbJhBukMkfXv64COWfPjEawnAvh0YEbAnRYinZR3KJRQqH"
+    "imyGmFMBWCB+qLiMJcDY9ylLIourHCq2tW0RYOqVnN+EziGBE7HD/E7qBXtMshAvCOU7Gf"
+    "4MH12WYz4mgA3ZeepHSrfhg5rHcBushKA1cjgo2IQxVXKB8CnyiUHmeRmDm9Hgw3nHRTkD"
+    "xt0GUFNPMBU9pEdSLaFstmvVW6VbAOaxpOnPQ4zahzsilgUNf9qZIDXWe1wUqRqhnApXWx"
+    "eurh1IK253kcYhbXbxU8L9N0MsP2QI5FXIkECo+1OqSDKmpoCqvFP8KG56OiKYtko0vVpL"
+    "Zpzil3btfA+60MGLvOwybp4eeffK2Wuen1JwNxGZsBLCjN6hOn4qPfCc9MDL7IRTsJBtfq"
+    "K5cL9jYKHi2dZtcSo0U5HEQfufKpJ4LZZszvmZH0JEnU+dpSpoaOmJKmxXiV2kcEjergoT"
+    "2h0mTOCc79fLKbmD0tuwRH/hZkc9Sb5JcdFyIUTnUjxGmxOqOYwI5Nqnr1PNf5LmPUnbIL"
+    "bkbffEAEJPc9a2TSh700nZ6vlPU9usqhtV5YVP+26qbvRgDJutGxXbqL4EjqTysaB6NKG1"
+    "n6xD7VtfIudw1i+Rcjjr52YcRFfSXYIPNuJm2eENSWq28w1pyRtRKuEg3Ik7KPEAhoRYEG"
+    "C5FWNaKRPOuFpdVqsaepY32/D6+kvCYsPxNPU23F4OzydHXddUXAh55WCSSEKV5zy/FpET"
+    "yQKsXonoP6Z5/ErXIUZLo0lViC5YScQVAM+PtMSE1B2NCnVadd6/Go9YhTqv1LCZUEfss1"
+    "UvVuM67bxcrSHQWQFkVYEYKrSTYC3X0zZwnA2hkrM3n2Ncp50oz07KLMaT/MV4kuaIHJ3C"
+    "BXIYpJUjtoyuitsycMEMYJPgXdgmVBXaLFpzhfAOWAM1hTSD1ESOmOYOizWuqcAmwc75EC"
+    "C1+UhY5UyxTHens8t38ArotixfHCcjgsws1U8311dPUw10U1RvMZ/vdxMZ7Fiz+Bn3Yy+M"
+    "f2PaWMw+sYADmEeXg3/TnEdfrofpiEE8YJiC7p33FHhV4HaVlSxRrWkh1+uD9ct4s/18Z7"
+    "af8WUt4DDdIgtUFWlGUQGNgDoQ4h1yEGndPWQhGrUtNCnpsI+ix/jelK64Sbkwvv7F5wm0"
+    "QPAb7fI0f7rOp3mBYV66X1KC9kwWbfzyhW2tVxW5hbBlqmBjNlEXFurCQuW11YWFMmwtFx"
+    "ZxIBW86pRaOzPFtX1dRxWS7b75qefX6kQWrSrHhJKCGcIkFPHYF1hVeab1FNJYFabkECy4"
+    "mnyQnXwtAdgtc5vWzb9N62Zu0xz0n2Qh5jrXgfghleipL93d9/tKJanvwjeWyvLdLYF42i"
+    "vB8LSXi1B0JQneI7iR3XjlvrWRwu97b0+a89LaFN3z2VUAFtM4SGKqfFuVb9devj3hwfJk"
+    "PJoW1W/HcoDh3xXZPS8c/vmS9sCsNS08gBQZy44kLez3HBelhUEko7LCDduXjguywveQOh"
+    "UTTDGVdjphtXiy4tWoANEXbyfA7km50LMo9swEn/wTGcSS8D2/Diamsofyl5fb6Gutf3nR"
+    "r6bY/g8S1qHV"
+)
@@ -14,7 +14,7 @@ class RefreshToken(models.Model, TimestampMixin):
     """Model for storing JWT refresh tokens with revocation support."""
     id = fields.IntField(primary_key=True)
     user = fields.ForeignKeyField("models.User", related_name="refresh_tokens", on_delete=fields.CASCADE)
-    token_hash = fields.CharField(max_length=64, db_index=True)  # SHA256 hash (64 hex chars)
+    token_hash = fields.CharField(max_length=64, unique=True)  # SHA256 hash (64 hex chars)
     expires_at = fields.DatetimeField()
     revoked = fields.BooleanField(default=False)
 
@@ -32,8 +32,8 @@ def make_user_filepath(user_id: int, filename: str) -> Path:
     """Generate a user-specific file path."""
     user_dir = config.storage_path / f"user_{user_id}"
 
-    # Ensure user directory exists
-    user_dir.mkdir(exist_ok=True)
+    # Ensure user directory exists, even if it was removed since the last call
+    user_dir.mkdir(parents=True, exist_ok=True)
     if not user_dir.is_dir():
         raise ValueError(f"User directory {user_dir} is not a directory.")
 
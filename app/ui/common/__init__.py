@@ -18,6 +18,8 @@ templates = Jinja2Templates(
     directory="app/ui/templates",
     context_processors=[app_config_context_processor]
 )
+# Only re-check template files for changes when running with auto-reload
+templates.env.auto_reload = config.app_reload
 templates.env.globals['get_flashed_messages'] = get_flashed_messages
 templates.env.filters['markdown'] = sanitised_markdown
 templates.env.filters['ago'] = time_ago
@@ -1,12 +1,17 @@
 """Pytest configuration and shared fixtures for pyupload tests."""
 
 import os
+import logging
+import functools
+import itertools
 import httpx
 import pytest
 import pytest_asyncio
-from contextlib import asynccontextmanager
-from asgi_lifespan import LifespanManager
+from contextlib import contextmanager
+from unittest.mock import Mock
+from starlette.testclient import TestClient
 from tortoise import Tortoise, connections
+from tortoise.transactions import in_transaction
 
 import shutil
 import tempfile
@@ -23,49 +28,150 @@ _TEST_STORAGE_DIR = tempfile.mkdtemp(prefix="pyupload_test_storage_")
 os.environ["STORAGE_PATH"] = _TEST_STORAGE_DIR
 
 from app import main  # noqa: E402
+from app.lib.auth import create_access_token  # noqa: E402
 from app.models import users  # noqa: E402
 
 
-@pytest_asyncio.fixture
-async def client(monkeypatch):
-    """Create an async HTTP client with in-memory test database."""
-    @asynccontextmanager
-    async def init_test_db():
-        """Initialize test database as async context manager to match production init_db."""
-        await Tortoise.init(
-            db_url="sqlite://:memory:",
-            modules={"models": ["app.models.users", "app.models.refresh_tokens", "app.models.uploads", "app.models.images"]}
-        )
-        await Tortoise.generate_schemas()
-        try:
-            yield
-        finally:
-            await connections.close_all()
-
-    # Use an in-memory database during tests
-    monkeypatch.setattr(main, "init_db", init_test_db)
-
-    transport = httpx.ASGITransport(app=main.app)
-
-    async with LifespanManager(main.app):
-        async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
-            yield test_client
+TEST_MODEL_MODULES = ["app.models.users", "app.models.refresh_tokens", "app.models.uploads", "app.models.images"]
 
-    await Tortoise.close_connections()
 
+@pytest_asyncio.fixture(scope="session")
+async def _tortoise():
+    """Initialize the in-memory SQLite database and generate its schema once per test session.
 
-@pytest_asyncio.fixture
-async def db():
-    """Initialize in-memory SQLite database for unit tests."""
+    The database lives in this process only, so parallel runners such as pytest-xdist
+    give each worker its own isolated database (and storage directory) without extra setup.
+    """
     await Tortoise.init(
         db_url="sqlite://:memory:",
-        modules={"models": ["app.models.users", "app.models.refresh_tokens", "app.models.uploads", "app.models.images"]}
+        modules={"models": TEST_MODEL_MODULES}
     )
     await Tortoise.generate_schemas()
+    # No fsync or temp files; the journal stays in memory so rollbacks still work
+    await connections.get("default").execute_script(
+        "PRAGMA synchronous = OFF; PRAGMA temp_store = MEMORY;"
+    )
     yield
     await Tortoise.close_connections()
 
 
+class _RollbackTest(Exception):
+    """Raised inside the per-test transaction to roll it back on teardown."""
+
+
+@pytest.fixture
+def assert_query_count(caplog):
+    """Return a context manager that fails unless exactly `expected` database queries run inside it.
+
+    Queries are counted from the DEBUG records Tortoise's database client logs for every statement.
+    """
+    @contextmanager
+    def _assert_query_count(expected: int):
+        with caplog.at_level(logging.DEBUG, logger="tortoise.db_client"):
+            start = len(caplog.records)
+            yield
+            queries = [r.getMessage() for r in caplog.records[start:] if r.name == "tortoise.db_client"]
+        assert len(queries) == expected, f"Expected {expected} queries, got {len(queries)}: {queries}"
+
+    return _assert_query_count
+
+
+@pytest.fixture(scope="session")
+def _test_client():
+    """Build one synchronous TestClient for the whole test session.
+
+    The client is never entered as a context manager, so the app lifespan (the
+    production init_db and the scheduler) does not run.
+    """
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def sync_client(_test_client):
+    """Provide the shared TestClient with its cookie jar cleared after each test."""
+    yield _test_client
+    _test_client.cookies.clear()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _async_test_client():
+    """Build one ASGI-backed async HTTP client for the whole test session.
+
+    Requests run on the test event loop rather than a TestClient portal thread. As with
+    `_test_client`, the app lifespan is not run: the session already owns the in-memory
+    database, so only the scheduler would start, and no test relies on it.
+    """
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
+
+
+@pytest_asyncio.fixture
+async def aclient(_async_test_client):
+    """Provide the shared async client with its cookie jar cleared after each test."""
+    yield _async_test_client
+    _async_test_client.cookies.clear()
+
+
+@pytest_asyncio.fixture
+async def client(aclient, db):
+    """Provide the shared async client for tests that use the in-memory test database."""
+    return aclient
+
+
+@pytest_asyncio.fixture
+async def db(_tortoise):
+    """Provide an empty in-memory SQLite database for each test.
+
+    The test runs inside a transaction that is rolled back afterwards, so its rows (and
+    AUTOINCREMENT counters) vanish without any DELETE or DDL.
+    """
+    try:
+        async with in_transaction():
+            yield
+            raise _RollbackTest
+    except _RollbackTest:
+        pass
+
+
+@pytest.fixture(scope="session")
+def mock_user():
+    """Provide a `User` stand-in for "testuser" (id 1) for tests that never touch the database."""
+    user = Mock(spec=users.User)
+    user.id = 1
+    user.username = "testuser"
+    return user
+
+
+@pytest.fixture(scope="session")
+def access_token_for():
+    """Return a function giving an access token for a username, signed once per username per session."""
+    @functools.lru_cache(maxsize=None)
+    def _access_token_for(username: str) -> str:
+        return create_access_token(data={"sub": username})
+
+    return _access_token_for
+
+
+@pytest.fixture
+def user_factory(db):
+    """Return a coroutine which creates a uniquely named User, accepting field overrides."""
+    counter = itertools.count(1)
+
+    async def make_user(**overrides):
+        n = next(counter)
+        fields = {
+            "username": f"user{n}",
+            "email": f"user{n}@example.com",
+            "password": "hashed_password",
+            "fingerprint_hash": f"fp-hash-{n}",
+        }
+        fields.update(overrides)
+        return await users.User.create(**fields)
+
+    return make_user
+
+
 @pytest.fixture(scope="session", autouse=True)
 def cleanup_storage():
     """Cleanup temporary storage directory after test session."""
@@ -19,14 +19,13 @@ import pytest
 from app.models.users import User
 from app.models.uploads import Upload
 from app.models.images import Image
-from app.lib.auth import create_access_token
 
 
 class TestGetFileMetadata:
     """Test GET /api/v1/files/{id} endpoint."""
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_success(self, client):
+    async def test_get_file_metadata_success(self, client, access_token_for):
         """Test successful retrieval of file metadata."""
         # Create user and file
         user = await User.create(
@@ -51,7 +50,7 @@ class TestGetFileMetadata:
         )
 
         # Authenticate with Bearer token
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
 
         # Get file metadata
         response = await client.get(
@@ -68,7 +67,7 @@ class TestGetFileMetadata:
         assert data["viewed"] == 5
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_returns_enriched_fields(self, client):
+    async def test_get_file_metadata_returns_enriched_fields(self, client, access_token_for):
         """Test that response includes enriched fields."""
         user = await User.create(
             username="enricheduser",
@@ -90,7 +89,7 @@ class TestGetFileMetadata:
             private=1,
         )
 
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
         # Using Bearer token in headers
 
         response = await client.get(f"/api/v1/files/{upload.id}", headers={"Authorization": f"Bearer {token}"})
@@ -110,7 +109,7 @@ class TestGetFileMetadata:
         assert data["is_owner"] is True
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_urls_are_absolute(self, client):
+    async def test_get_file_metadata_urls_are_absolute(self, client, access_token_for):
         """Test that URLs returned are absolute URLs."""
         user = await User.create(
             username="urluser",
@@ -132,7 +131,7 @@ class TestGetFileMetadata:
             private=0,
         )
 
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
         # Using Bearer token in headers
 
         response = await client.get(f"/api/v1/files/{upload.id}", headers={"Authorization": f"Bearer {token}"})
@@ -149,7 +148,7 @@ class TestGetFileMetadata:
         assert f"/download/{upload.id}/" in data["download_url"]
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_field_name_transformation(self, client):
+    async def test_get_file_metadata_field_name_transformation(self, client, access_token_for):
         """Test that field names are transformed correctly."""
         user = await User.create(
             username="nameuser",
@@ -171,7 +170,7 @@ class TestGetFileMetadata:
             private=0,
         )
 
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
         # Using Bearer token in headers
 
         response = await client.get(f"/api/v1/files/{upload.id}", headers={"Authorization": f"Bearer {token}"})
@@ -185,7 +184,7 @@ class TestGetFileMetadata:
         assert data["originalname"] == "original_name.txt"
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_includes_image_data(self, client, tmp_path, monkeypatch):
+    async def test_get_file_metadata_includes_image_data(self, client, tmp_path, monkeypatch, access_token_for):
         """Test that image metadata is included for image uploads."""
         import app.models.uploads
         monkeypatch.setattr(app.models.uploads.config, "storage_path", tmp_path)
@@ -225,7 +224,7 @@ class TestGetFileMetadata:
             channels=3,
         )
 
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
         # Using Bearer token in headers
 
         response = await client.get(f"/api/v1/files/{upload.id}", headers={"Authorization": f"Bearer {token}"})
@@ -241,7 +240,7 @@ class TestGetFileMetadata:
         assert data["image"][0]["height"] == 600
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_404_for_nonexistent_file(self, client):
+    async def test_get_file_metadata_404_for_nonexistent_file(self, client, access_token_for):
         """Test that getting metadata for non-existent file returns 404."""
         user = await User.create(
             username="notfounduser",
@@ -250,7 +249,7 @@ class TestGetFileMetadata:
             fingerprint_hash="fp-hash",
         )
 
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
 
         # Try to get non-existent file with authentication
         response = await client.get(
@@ -262,7 +261,7 @@ class TestGetFileMetadata:
         assert "not found" in response.json()["detail"].lower()
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_403_for_private_file(self, client):
+    async def test_get_file_metadata_403_for_private_file(self, client, access_token_for):
         """Test that accessing another user's private file returns 403."""
         owner = await User.create(
             username="privateowner",
@@ -292,7 +291,7 @@ class TestGetFileMetadata:
         )
 
         # Authenticate as different user
-        token = create_access_token({"sub": other_user.username})
+        token = access_token_for(other_user.username)
         # Using Bearer token in headers
 
         response = await client.get(f"/api/v1/files/{upload.id}", headers={"Authorization": f"Bearer {token}"})
@@ -301,7 +300,7 @@ class TestGetFileMetadata:
         assert "permission" in response.json()["detail"].lower()
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_allows_owner_access_to_private_file(self, client):
+    async def test_get_file_metadata_allows_owner_access_to_private_file(self, client, access_token_for):
         """Test that owner can access their own private file metadata."""
         user = await User.create(
             username="ownerprivate",
@@ -323,7 +322,7 @@ class TestGetFileMetadata:
             private=1,
         )
 
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
         # Using Bearer token in headers
 
         response = await client.get(f"/api/v1/files/{upload.id}", headers={"Authorization": f"Bearer {token}"})
@@ -334,7 +333,7 @@ class TestGetFileMetadata:
         assert data["is_private"] is True
 
     @pytest.mark.asyncio
-    async def test_get_file_metadata_allows_public_file_access(self, client):
+    async def test_get_file_metadata_allows_public_file_access(self, client, access_token_for):
         """Test that any authenticated user can access public file metadata."""
         owner = await User.create(
             username="publicowner",
@@ -364,7 +363,7 @@ class TestGetFileMetadata:
         )
 
         # Authenticate as different user
-        token = create_access_token({"sub": other_user.username})
+        token = access_token_for(other_user.username)
         # Using Bearer token in headers
 
         response = await client.get(f"/api/v1/files/{upload.id}", headers={"Authorization": f"Bearer {token}"})
@@ -19,14 +19,13 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.models.users import User
 from app.models.uploads import Upload, UploadResult, UploadMetadata
-from app.lib.auth import create_access_token
 
 
 class TestUploadEndpointAuthentication:
     """Test authentication requirements for upload endpoint."""
 
     @pytest.mark.asyncio
-    async def test_endpoint_accessible_at_post_uploads(self, client):
+    async def test_endpoint_accessible_at_post_uploads(self, client, access_token_for):
         """Test that endpoint is accessible at POST /api/v1/uploads."""
         # Create a user and token
         user = await User.create(
@@ -37,8 +36,7 @@ class TestUploadEndpointAuthentication:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Make request with proper auth
         response = await client.post(
@@ -81,7 +79,7 @@ class TestUploadEndpointInputValidation:
     """Test input validation for upload endpoint."""
 
     @pytest.mark.asyncio
-    async def test_returns_400_if_no_files_provided(self, client):
+    async def test_returns_400_if_no_files_provided(self, client, access_token_for):
         """Test that endpoint returns 400 or 422 when no files are provided."""
         # Create a user and token
         user = await User.create(
@@ -92,8 +90,7 @@ class TestUploadEndpointInputValidation:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Make request without files
         response = await client.post(
@@ -109,7 +106,7 @@ class TestUploadEndpointInputValidation:
         assert "detail" in json_response
 
     @pytest.mark.asyncio
-    async def test_returns_400_if_empty_file_list(self, client):
+    async def test_returns_400_if_empty_file_list(self, client, access_token_for):
         """Test that endpoint returns 400 when file list is empty."""
         # Create a user and token
         user = await User.create(
@@ -120,8 +117,7 @@ class TestUploadEndpointInputValidation:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Make request with empty files parameter
         response = await client.post(
@@ -138,7 +134,7 @@ class TestUploadEndpointSuccessfulUploads:
     """Test successful file upload scenarios."""
 
     @pytest.mark.asyncio
-    async def test_endpoint_returns_200_with_auth(self, client, monkeypatch):
+    async def test_endpoint_returns_200_with_auth(self, client, monkeypatch, access_token_for):
         """Test that endpoint returns 200 when authenticated."""
         # Create a user and token
         user = await User.create(
@@ -149,8 +145,7 @@ class TestUploadEndpointSuccessfulUploads:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Mock the upload handler to avoid filesystem operations
         from unittest.mock import AsyncMock
@@ -180,7 +175,7 @@ class TestUploadEndpointResponseStructure:
     """Test response structure and format."""
 
     @pytest.mark.asyncio
-    async def test_upload_returns_results_array(self, client, monkeypatch):
+    async def test_upload_returns_results_array(self, client, monkeypatch, access_token_for):
         """Test that upload endpoint returns results array."""
         # Create a user and token
         user = await User.create(
@@ -191,8 +186,7 @@ class TestUploadEndpointResponseStructure:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Mock the upload handler to return mock results
         from unittest.mock import AsyncMock
@@ -232,7 +226,7 @@ class TestUploadEndpointErrorHandling:
     """Test error handling and per-file error recovery."""
 
     @pytest.mark.asyncio
-    async def test_batch_upload_with_mixed_results(self, client, monkeypatch):
+    async def test_batch_upload_with_mixed_results(self, client, monkeypatch, access_token_for):
         """Test batch upload where some files succeed and some fail."""
         # Create a user and token
         user = await User.create(
@@ -243,8 +237,7 @@ class TestUploadEndpointErrorHandling:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Mock the upload handler to return mixed results
         from unittest.mock import AsyncMock
@@ -290,7 +283,7 @@ class TestUploadEndpointErrorHandling:
         assert len(results) == 3
 
     @pytest.mark.asyncio
-    async def test_batch_upload_with_all_files_failing(self, client, monkeypatch):
+    async def test_batch_upload_with_all_files_failing(self, client, monkeypatch, access_token_for):
         """Test batch upload where all files fail."""
         # Create a user and token
         user = await User.create(
@@ -301,8 +294,7 @@ class TestUploadEndpointErrorHandling:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Mock the upload handler to return all failures
         from unittest.mock import AsyncMock
@@ -340,7 +332,7 @@ class TestUploadEndpointErrorHandling:
         assert len(results) == 2
 
     @pytest.mark.asyncio
-    async def test_quota_exceeded_error_handled(self, client, monkeypatch):
+    async def test_quota_exceeded_error_handled(self, client, monkeypatch, access_token_for):
         """Test that quota exceeded errors are properly handled."""
         # Create a user and token
         user = await User.create(
@@ -351,8 +343,7 @@ class TestUploadEndpointErrorHandling:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Mock the upload handler to return quota exceeded error
         from unittest.mock import AsyncMock
@@ -392,7 +383,7 @@ class TestUploadEndpointResponseTypes:
     """Test response type correctness."""
 
     @pytest.mark.asyncio
-    async def test_response_is_valid_json(self, client, monkeypatch):
+    async def test_response_is_valid_json(self, client, monkeypatch, access_token_for):
         """Test that response is valid JSON."""
         # Create a user and token
         user = await User.create(
@@ -403,8 +394,7 @@ class TestUploadEndpointResponseTypes:
         )
         
         # Create access token
-        token_data = {"sub": str(user.username)}
-        access_token = create_access_token(data=token_data)
+        access_token = access_token_for(user.username)
         
         # Mock the upload handler
         from unittest.mock import AsyncMock
@@ -15,16 +15,19 @@ Acceptance Criteria:
 import pytest
 import jwt
 from datetime import datetime, timedelta, timezone
-from fastapi.testclient import TestClient
 from fastapi import Request
 from unittest.mock import Mock, AsyncMock
 
-from app.main import app
 from app.lib.config import get_app_config
-from app.lib.auth import create_access_token, create_token_cookie, get_current_user_from_request
+from app.lib.auth import create_access_token, create_refresh_token, create_token_cookie, get_current_user_from_request
+from app.lib.security import hash_password
 from app.models.users import User, UserPydantic, authenticate_user
 
 
+# bcrypt hash of "password123", computed once at import rather than in every authenticate_user test
+PASSWORD_HASH = hash_password("password123")
+
+
 class TestJWTTokenCreation:
     """Test JWT token creation and structure."""
 
@@ -275,19 +278,15 @@ class TestLoginEndpoint:
     """Test login endpoint with JWT token generation."""
 
     @pytest.mark.asyncio
-    async def test_login_endpoint_exists(self):
+    async def test_login_endpoint_exists(self, aclient):
         """Test that login endpoint is accessible."""
-        client = TestClient(app)
-        response = client.get("/login")
+        response = await aclient.get("/login")
         
         assert response.status_code == 200
 
     @pytest.mark.asyncio
-    async def test_login_post_with_valid_credentials_sets_cookie(self, monkeypatch):
+    async def test_login_post_with_valid_credentials_sets_cookie(self, aclient, monkeypatch):
         """Test that successful login sets access_token cookie."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Mock authenticate_user to return a user
         mock_user = Mock(spec=User)
         mock_user.username = "testuser"
@@ -305,7 +304,6 @@ class TestLoginEndpoint:
         import app.lib.auth
         monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
         monkeypatch.setattr(app.lib.auth, "store_refresh_token", mock_store_refresh_token)
-        client = TestClient(fastapi_app)
         
         # Mock authenticate_user to return None
         async def mock_authenticate(**kwargs):
@@ -315,7 +313,7 @@ class TestLoginEndpoint:
         monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
         
         # Attempt login with wrong credentials
-        response = client.post(
+        response = await aclient.post(
             "/login",
             data={"username": "testuser", "password": "wrongpassword"}
         )
@@ -327,7 +325,7 @@ class TestLogoutEndpoint:
     """Test logout endpoint with JWT token removal."""
 
     @pytest.mark.asyncio
-    async def test_logout_endpoint_exists(self, monkeypatch):
+    async def test_logout_endpoint_exists(self, aclient, monkeypatch):
         """Test that logout endpoint is accessible."""
         from app.lib.config import get_app_config
         config = get_app_config()
@@ -347,15 +345,14 @@ class TestLogoutEndpoint:
         
         monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
         
-        client = TestClient(app)
-        client.cookies.set("access_token", token)
-        response = client.get("/logout", follow_redirects=False)
+        aclient.cookies.set("access_token", token)
+        response = await aclient.get("/logout", follow_redirects=False)
         
         # Should redirect
         assert response.status_code in [302, 303, 307]
 
     @pytest.mark.asyncio
-    async def test_logout_deletes_access_token_cookie(self, monkeypatch):
+    async def test_logout_deletes_access_token_cookie(self, aclient, monkeypatch):
         """Test that logout deletes the access_token cookie."""
         # Create a valid token to authenticate
         token = create_access_token(data={"sub": "testuser"})
@@ -372,10 +369,9 @@ class TestLogoutEndpoint:
         
         monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
         
-        client = TestClient(app)
-        client.cookies.set("access_token", token)
+        aclient.cookies.set("access_token", token)
         
-        response = client.get("/logout", follow_redirects=False)
+        response = await aclient.get("/logout", follow_redirects=False)
         
         # Cookie should be deleted (set to empty or expired)
         # Check if access_token is in delete cookies
@@ -385,7 +381,7 @@ class TestLogoutEndpoint:
         assert "access_token" in set_cookie_header.lower() or response.status_code in [302, 303, 307]
 
     @pytest.mark.asyncio
-    async def test_logout_redirects_to_home(self, monkeypatch):
+    async def test_logout_redirects_to_home(self, aclient, monkeypatch):
         """Test that logout redirects to home page."""
         # Create a valid token to authenticate
         token = create_access_token(data={"sub": "testuser"})
@@ -402,10 +398,9 @@ class TestLogoutEndpoint:
         
         monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
         
-        client = TestClient(app)
-        client.cookies.set("access_token", token)
+        aclient.cookies.set("access_token", token)
         
-        response = client.get("/logout", follow_redirects=False)
+        response = await aclient.get("/logout", follow_redirects=False)
         
         # Should be a redirect response
         assert response.status_code in [302, 303, 307]
@@ -472,12 +467,11 @@ class TestAuthenticateUser:
     async def test_authenticate_user_with_username(self, monkeypatch):
         """Test authenticating user by username."""
         from app.models.users import authenticate_user
-        from app.lib.security import hash_password
         
         # Create mock user
         mock_user = Mock(spec=User)
         mock_user.username = "testuser"
-        mock_user.password = hash_password("password123")
+        mock_user.password = PASSWORD_HASH
         
         async def mock_get_or_none(**kwargs):
             if kwargs.get("username") == "testuser":
@@ -496,13 +490,12 @@ class TestAuthenticateUser:
     async def test_authenticate_user_with_email(self, monkeypatch):
         """Test authenticating user by email."""
         from app.models.users import authenticate_user
-        from app.lib.security import hash_password
         
         # Create mock user
         mock_user = Mock(spec=User)
         mock_user.username = "testuser"
         mock_user.email = "test@example.com"
-        mock_user.password = hash_password("password123")
+        mock_user.password = PASSWORD_HASH
         
         async def mock_get_or_none(**kwargs):
             if kwargs.get("email") == "test@example.com":
@@ -520,12 +513,11 @@ class TestAuthenticateUser:
     async def test_authenticate_user_wrong_password(self, monkeypatch):
         """Test authentication fails with wrong password."""
         from app.models.users import authenticate_user
-        from app.lib.security import hash_password
         
         # Create mock user
         mock_user = Mock(spec=User)
         mock_user.username = "testuser"
-        mock_user.password = hash_password("correct_password")
+        mock_user.password = PASSWORD_HASH
         
         async def mock_get_or_none(**kwargs):
             if kwargs.get("username") == "testuser":
@@ -564,11 +556,8 @@ class TestLoginRefreshTokenIntegration:
     """Test login endpoint properly creates and stores refresh tokens."""
 
     @pytest.mark.asyncio
-    async def test_login_sets_refresh_token_cookie(self, monkeypatch):
+    async def test_login_sets_refresh_token_cookie(self, aclient, monkeypatch):
         """Test that successful login sets refresh_token cookie."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Mock authenticate_user
         mock_user = Mock(spec=User)
         mock_user.username = "testuser"
@@ -586,7 +575,7 @@ class TestLoginRefreshTokenIntegration:
         monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
         monkeypatch.setattr(app.lib.auth, "store_refresh_token", mock_store_refresh_token)
         
-        response = client.post(
+        response = await aclient.post(
             "/login",
             data={"username": "testuser", "password": "password"}
         )
@@ -596,11 +585,8 @@ class TestLoginRefreshTokenIntegration:
         assert "refresh_token" in response.cookies
 
     @pytest.mark.asyncio
-    async def test_login_stores_refresh_token_in_database(self, monkeypatch):
+    async def test_login_stores_refresh_token_in_database(self, aclient, monkeypatch):
         """Test that login stores refresh token in database."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Track if store was called
         store_called = {"value": False, "token": None, "user": None}
         
@@ -623,7 +609,7 @@ class TestLoginRefreshTokenIntegration:
         monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
         monkeypatch.setattr(app.lib.auth, "store_refresh_token", mock_store_refresh_token)
         
-        response = client.post(
+        response = await aclient.post(
             "/login",
             data={"username": "testuser", "password": "password"}
         )
@@ -638,16 +624,12 @@ class TestLogoutRefreshTokenIntegration:
     """Test logout endpoint properly revokes refresh tokens."""
 
     @pytest.mark.asyncio
-    async def test_logout_revokes_refresh_token(self, monkeypatch):
+    async def test_logout_revokes_refresh_token(self, aclient, monkeypatch):
         """Test that logout revokes the refresh token."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Track if revoke was called
         revoke_called = {"value": False}
         
         # Create tokens
-        from app.lib.auth import create_access_token, create_refresh_token
         mock_user = Mock(spec=User)
         mock_user.id = 1
         mock_user.username = "testuser"
@@ -671,21 +653,17 @@ class TestLogoutRefreshTokenIntegration:
         monkeypatch.setattr(app.ui.auth, "revoke_refresh_token", mock_revoke)
         
         # Make request with both tokens
-        client.cookies.set("access_token", access_token)
-        client.cookies.set("refresh_token", refresh_token)
-        response = client.get("/logout", follow_redirects=False)
+        aclient.cookies.set("access_token", access_token)
+        aclient.cookies.set("refresh_token", refresh_token)
+        response = await aclient.get("/logout", follow_redirects=False)
         
         # Should have revoked the token
         assert revoke_called["value"] is True
 
     @pytest.mark.asyncio
-    async def test_logout_deletes_both_cookies(self, monkeypatch):
+    async def test_logout_deletes_both_cookies(self, aclient, monkeypatch):
         """Test that logout deletes both access and refresh token cookies."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Create tokens
-        from app.lib.auth import create_access_token, create_refresh_token
         mock_user = Mock(spec=User)
         mock_user.id = 1
         mock_user.username = "testuser"
@@ -708,22 +686,18 @@ class TestLogoutRefreshTokenIntegration:
         monkeypatch.setattr(app.lib.auth, "revoke_refresh_token", mock_revoke)
         
         # Make request
-        client.cookies.set("access_token", access_token)
-        client.cookies.set("refresh_token", refresh_token)
-        response = client.get("/logout", follow_redirects=False)
+        aclient.cookies.set("access_token", access_token)
+        aclient.cookies.set("refresh_token", refresh_token)
+        response = await aclient.get("/logout", follow_redirects=False)
         
         # Both cookies should be deleted (marked for deletion with empty value or max_age=0)
         # The cookies dict will show them but they're marked for deletion
         assert response.status_code in [302, 303, 307]
 
     @pytest.mark.asyncio
-    async def test_logout_works_without_refresh_token(self, monkeypatch):
+    async def test_logout_works_without_refresh_token(self, aclient, monkeypatch):
         """Test that logout works even without refresh token (backward compat)."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Create only access token
-        from app.lib.auth import create_access_token
         mock_user = Mock(spec=User)
         mock_user.id = 1
         mock_user.username = "testuser"
@@ -745,8 +719,8 @@ class TestLogoutRefreshTokenIntegration:
         monkeypatch.setattr(app.lib.auth, "revoke_refresh_token", mock_revoke)
         
         # Make request with only access token
-        client.cookies.set("access_token", access_token)
-        response = client.get("/logout", follow_redirects=False)
+        aclient.cookies.set("access_token", access_token)
+        response = await aclient.get("/logout", follow_redirects=False)
         
         # Should still succeed
         assert response.status_code in [302, 303, 307]
@@ -756,13 +730,9 @@ class TestLogoutAllEndpoint:
     """Test /logout-all endpoint functionality."""
 
     @pytest.mark.asyncio
-    async def test_logout_all_endpoint_exists(self, monkeypatch):
+    async def test_logout_all_endpoint_exists(self, aclient, monkeypatch):
         """Test that /logout-all endpoint is accessible."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Create token for authentication
-        from app.lib.auth import create_access_token
         mock_user = Mock(spec=User)
         mock_user.id = 1
         mock_user.username = "testuser"
@@ -783,35 +753,28 @@ class TestLogoutAllEndpoint:
         monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
         monkeypatch.setattr(app.lib.auth, "revoke_user_refresh_tokens", mock_revoke_all)
         
-        client.cookies.set("access_token", access_token)
-        response = client.get("/logout-all", follow_redirects=False)
+        aclient.cookies.set("access_token", access_token)
+        response = await aclient.get("/logout-all", follow_redirects=False)
         
         # Should redirect
         assert response.status_code in [302, 303, 307]
 
     @pytest.mark.asyncio
-    async def test_logout_all_requires_authentication(self):
+    async def test_logout_all_requires_authentication(self, aclient):
         """Test that /logout-all requires authenticated user."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Make request without authentication
-        response = client.get("/logout-all", follow_redirects=False)
+        response = await aclient.get("/logout-all", follow_redirects=False)
         
         # Should redirect to login (303) when not authenticated
         assert response.status_code == 303
 
     @pytest.mark.asyncio
-    async def test_logout_all_revokes_all_user_tokens(self, monkeypatch):
+    async def test_logout_all_revokes_all_user_tokens(self, aclient, monkeypatch):
         """Test that /logout-all revokes all user's refresh tokens."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Track revoke call
         revoke_all_called = {"value": False, "count": 0}
         
         # Create token
-        from app.lib.auth import create_access_token
         mock_user = Mock(spec=User)
         mock_user.id = 1
         mock_user.username = "testuser"
@@ -834,21 +797,17 @@ class TestLogoutAllEndpoint:
         monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
         monkeypatch.setattr(app.ui.auth, "revoke_user_refresh_tokens", mock_revoke_all)
         
-        client.cookies.set("access_token", access_token)
-        response = client.get("/logout-all", follow_redirects=False)
+        aclient.cookies.set("access_token", access_token)
+        response = await aclient.get("/logout-all", follow_redirects=False)
         
         # Should have called revoke_user_refresh_tokens
         assert revoke_all_called["value"] is True
         assert revoke_all_called["count"] == 5
 
     @pytest.mark.asyncio
-    async def test_logout_all_deletes_current_cookies(self, monkeypatch):
+    async def test_logout_all_deletes_current_cookies(self, aclient, monkeypatch):
         """Test that /logout-all deletes current device cookies."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Create tokens
-        from app.lib.auth import create_access_token, create_refresh_token
         mock_user = Mock(spec=User)
         mock_user.id = 1
         mock_user.username = "testuser"
@@ -871,9 +830,9 @@ class TestLogoutAllEndpoint:
         monkeypatch.setattr(app.lib.auth, "revoke_user_refresh_tokens", mock_revoke_all)
         
         # Make request
-        client.cookies.set("access_token", access_token)
-        client.cookies.set("refresh_token", refresh_token)
-        response = client.get("/logout-all", follow_redirects=False)
+        aclient.cookies.set("access_token", access_token)
+        aclient.cookies.set("refresh_token", refresh_token)
+        response = await aclient.get("/logout-all", follow_redirects=False)
         
         # Should redirect and delete cookies
         assert response.status_code in [302, 303, 307]
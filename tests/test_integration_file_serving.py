@@ -14,14 +14,13 @@ import pytest
 from io import BytesIO
 from app.models.users import User
 from app.models.uploads import Upload
-from app.lib.auth import create_access_token
 
 
 class TestFileServingWorkflow:
     """Integration tests for complete file serving workflows."""
 
     @pytest.mark.asyncio
-    async def test_upload_view_download_workflow(self, client, tmp_path, monkeypatch):
+    async def test_upload_view_download_workflow(self, client, tmp_path, monkeypatch, access_token_for):
         """Test complete workflow: upload file → view it → download it."""
         import app.models.uploads
         import app.lib.file_storage
@@ -36,7 +35,7 @@ class TestFileServingWorkflow:
             fingerprint_hash="fp-workflow",
             is_registered=True,
         )
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
 
         # Step 2: Upload a file via API
         test_file_content = b"This is test content for workflow integration test"
@@ -113,7 +112,7 @@ class TestFileServingWorkflow:
         assert upload.viewed == 1
 
     @pytest.mark.asyncio
-    async def test_private_file_workflow_multi_user(self, client, tmp_path, monkeypatch):
+    async def test_private_file_workflow_multi_user(self, client, tmp_path, monkeypatch, access_token_for):
         """Test private file access control across multiple users."""
         import app.models.uploads
         monkeypatch.setattr(app.models.uploads.config, "storage_path", tmp_path)
@@ -146,7 +145,7 @@ class TestFileServingWorkflow:
         )
 
         # Scenario 1: Owner can access
-        owner_token = create_access_token({"sub": owner.username})
+        owner_token = access_token_for(owner.username)
         client.cookies.set("access_token", owner_token)
         owner_response = await client.get(f"/get/{upload.id}/private_file.txt")
         assert owner_response.status_code == 200
@@ -168,7 +167,7 @@ class TestFileServingWorkflow:
             password="password",
             fingerprint_hash="fp-other",
         )
-        other_token = create_access_token({"sub": other_user.username})
+        other_token = access_token_for(other_user.username)
         client.cookies.set("access_token", other_token)
         other_response = await client.get(f"/get/{upload.id}/private_file.txt")
         assert other_response.status_code == 403
@@ -251,7 +250,7 @@ class TestFileServingSecurity:
         assert correct_response.content == b"legitimate content"
 
     @pytest.mark.asyncio
-    async def test_access_control_bypass_attempts(self, client, tmp_path, monkeypatch):
+    async def test_access_control_bypass_attempts(self, client, tmp_path, monkeypatch, access_token_for):
         """Test that access control cannot be bypassed."""
         import app.models.uploads
         monkeypatch.setattr(app.models.uploads.config, "storage_path", tmp_path)
@@ -298,7 +297,7 @@ class TestFileServingSecurity:
         assert response3.status_code == 404
 
         # Attempt 4: Verify legitimate owner access still works
-        owner_token = create_access_token({"sub": owner.username})
+        owner_token = access_token_for(owner.username)
         client.cookies.set("access_token", owner_token)
         owner_response = await client.get(f"/get/{upload.id}/secure.txt")
         assert owner_response.status_code == 200
@@ -364,7 +363,7 @@ class TestFileServingEdgeCases:
         assert response.content == b"content with special chars"
 
     @pytest.mark.asyncio
-    async def test_concurrent_access_increments_view_counter(self, client, tmp_path, monkeypatch):
+    async def test_concurrent_access_increments_view_counter(self, client, tmp_path, monkeypatch, access_token_for):
         """Test that multiple concurrent accesses increment view counter correctly."""
         import app.models.uploads
         import asyncio
@@ -409,7 +408,7 @@ class TestFileServingEdgeCases:
 
         # Access file concurrently from different users
         async def access_file(user):
-            token = create_access_token({"sub": user.username})
+            token = access_token_for(user.username)
             client.cookies.set("access_token", token)
             response = await client.get(f"/get/{upload.id}/concurrent.txt")
             return response.status_code
@@ -426,7 +425,7 @@ class TestFileServingEdgeCases:
         # In production with proper DB, this would be 5
 
     @pytest.mark.asyncio
-    async def test_api_metadata_endpoint_integration(self, client, tmp_path, monkeypatch):
+    async def test_api_metadata_endpoint_integration(self, client, tmp_path, monkeypatch, access_token_for):
         """Test API metadata endpoint integration with file serving."""
         import app.models.uploads
         monkeypatch.setattr(app.models.uploads.config, "storage_path", tmp_path)
@@ -456,7 +455,7 @@ class TestFileServingEdgeCases:
         )
 
         # Step 1: Get metadata from API
-        token = create_access_token({"sub": user.username})
+        token = access_token_for(user.username)
         metadata_response = await client.get(
             f"/api/v1/files/{upload.id}",
             headers={"Authorization": f"Bearer {token}"}
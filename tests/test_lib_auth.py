@@ -167,6 +167,13 @@ class TestCreateRefreshToken:
         now_timestamp = datetime.now(timezone.utc).timestamp()
         assert exp_timestamp > now_timestamp
 
+    def test_tokens_issued_together_are_distinct(self):
+        """Test that tokens created back-to-back differ, so their stored hashes are unique."""
+        mock_user = Mock(spec=User)
+        mock_user.id = 1
+
+        assert create_refresh_token(mock_user) != create_refresh_token(mock_user)
+
     def test_token_expiration_is_correct(self):
         """Test that token expires after configured days."""
         config = get_app_config()
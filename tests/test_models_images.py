@@ -175,7 +175,7 @@ class TestImageModel:
         # Verify we can retrieve by querying all
         all_images = await Image.all()
         assert len(all_images) > 0
-        assert any(i.id == image.id for i in all_images)
+        assert image.id in {i.id for i in all_images}
 
     @pytest.mark.asyncio
     async def test_image_model_timestamp_mixin_created_at(self, db):
@@ -6,7 +6,7 @@ with proper relationships to User model and database constraints.
 Acceptance Criteria:
 - RefreshToken instances can be created with all required fields
 - Foreign key relationship to User model works correctly
-- Token hash is stored correctly
+- Token hash is stored correctly and unique
 - Expires_at datetime handling works properly
 - Revoked flag defaults to False
 - Database constraints are enforced
@@ -16,22 +16,47 @@ Acceptance Criteria:
 import pytest
 import hashlib
 from datetime import datetime, timedelta, timezone
+from tortoise.exceptions import IntegrityError
 
 from app.models.users import User
 from app.models.refresh_tokens import RefreshToken
 
 
-@pytest.fixture(scope="function")
+TOKEN_HASH = hashlib.sha256(b"test_token").hexdigest()
+EXPIRED_HASH = hashlib.sha256(b"expired_token").hexdigest()
+VALID_HASH = hashlib.sha256(b"valid_token").hexdigest()
+TOKEN_HASHES = [hashlib.sha256(f"token_{i}".encode()).hexdigest() for i in range(3)]
+
+SEVEN_DAYS = timedelta(days=7)
+
+# Fixed expiry points for tests that only care which side of "now" a token sits on.
+NOW = datetime.now(timezone.utc)
+FUTURE_EXPIRY = NOW + SEVEN_DAYS
+PAST_EXPIRY = NOW - timedelta(days=1)
+
+
+def _refresh_token_kwargs(**overrides):
+    """Return RefreshToken field values for an unrevoked, unexpired token, with `overrides` applied."""
+    return {
+        "token_hash": TOKEN_HASH,
+        "expires_at": FUTURE_EXPIRY,
+        "revoked": False,
+        **overrides,
+    }
+
+
+@pytest.fixture
 async def test_user(db):
-    """Create a test user for refresh token tests."""
-    user = await User.create(
+    """Create a test user for refresh token tests.
+
+    Rows are removed by the `db` fixture's teardown, so no explicit delete is needed.
+    """
+    return await User.create(
         username="testuser",
         email="test@example.com",
         password="dummy_hash",
         remember_token=""
     )
-    yield user
-    await user.delete()
 
 
 class TestRefreshTokenModel:
@@ -40,55 +65,53 @@ class TestRefreshTokenModel:
     @pytest.mark.asyncio
     async def test_create_refresh_token(self, test_user):
         """Test that RefreshToken instance can be created successfully."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
         refresh_token = await RefreshToken.create(
             user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at,
+            token_hash=TOKEN_HASH,
+            expires_at=FUTURE_EXPIRY,
             revoked=False
         )
 
         assert refresh_token.id is not None
         assert refresh_token.user_id == test_user.id
-        assert refresh_token.token_hash == token_hash
-        assert refresh_token.expires_at == expires_at
+        assert refresh_token.token_hash == TOKEN_HASH
+        assert refresh_token.expires_at == FUTURE_EXPIRY
         assert refresh_token.revoked is False
 
-        await refresh_token.delete()
-
     @pytest.mark.asyncio
     async def test_refresh_token_foreign_key_relationship(self, test_user):
         """Test that foreign key relationship to User works."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at
-        )
+        refresh_token = await RefreshToken.create(user=test_user, **_refresh_token_kwargs())
 
         # Fetch the relationship
         await refresh_token.fetch_related("user")
         assert refresh_token.user.id == test_user.id
         assert refresh_token.user.username == test_user.username
 
-        await refresh_token.delete()
+    @pytest.mark.asyncio
+    async def test_prefetch_related_user_batches_queries(self, test_user, assert_query_count):
+        """Test that prefetch_related loads the user for every token up front."""
+        await RefreshToken.bulk_create([
+            RefreshToken(user=test_user, **_refresh_token_kwargs(token_hash=hashlib.sha256(f"prefetch_{i}".encode()).hexdigest()))
+            for i in range(5)
+        ])
+
+        # One query for the tokens plus one IN (...) query for their users, however many tokens there are
+        with assert_query_count(2):
+            tokens = await RefreshToken.filter(user=test_user).prefetch_related("user")
+
+        # Reading the prefetched users hits the database no further
+        with assert_query_count(0):
+            usernames = [token.user.username for token in tokens]
+        assert usernames == [test_user.username] * 5
 
     @pytest.mark.asyncio
     async def test_refresh_token_hash_stored_correctly(self, test_user):
         """Test that token_hash is stored correctly."""
         original_token = "my_secret_token_12345"
         token_hash = hashlib.sha256(original_token.encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
 
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at
-        )
+        refresh_token = await RefreshToken.create(user=test_user, **_refresh_token_kwargs(token_hash=token_hash))
 
         # Verify hash is stored correctly
         assert refresh_token.token_hash == token_hash
@@ -99,17 +122,23 @@ class TestRefreshTokenModel:
         assert found is not None
         assert found.id == refresh_token.id
 
-        await refresh_token.delete()
+    @pytest.mark.asyncio
+    async def test_token_hash_is_unique(self, test_user):
+        """Test that a second token with the same hash is rejected."""
+        await RefreshToken.create(user=test_user, **_refresh_token_kwargs())
+
+        with pytest.raises(IntegrityError):
+            await RefreshToken.create(user=test_user, **_refresh_token_kwargs())
 
     @pytest.mark.asyncio
     async def test_refresh_token_expires_at_datetime(self, test_user):
         """Test that expires_at datetime is handled correctly."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+        now = datetime.now(timezone.utc)
+        expires_at = now + SEVEN_DAYS
 
         refresh_token = await RefreshToken.create(
             user=test_user,
-            token_hash=token_hash,
+            token_hash=TOKEN_HASH,
             expires_at=expires_at
         )
 
@@ -118,40 +147,33 @@ class TestRefreshTokenModel:
         assert isinstance(refresh_token.expires_at, datetime)
         
         # Should be in the future
-        assert refresh_token.expires_at > datetime.now(timezone.utc)
+        assert refresh_token.expires_at > now
 
         # Should be approximately 7 days from now (within 1 minute tolerance)
         time_diff = abs((refresh_token.expires_at - expires_at).total_seconds())
         assert time_diff < 60
 
-        await refresh_token.delete()
-
     @pytest.mark.asyncio
     async def test_refresh_token_revoked_defaults_to_false(self, test_user):
         """Test that revoked flag defaults to False."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
         # Create without specifying revoked
         refresh_token = await RefreshToken.create(
             user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at
+            token_hash=TOKEN_HASH,
+            expires_at=FUTURE_EXPIRY
         )
 
         assert refresh_token.revoked is False
 
-        await refresh_token.delete()
-
     @pytest.mark.asyncio
     async def test_refresh_token_timestamps(self, test_user):
         """Test that created_at and updated_at timestamps work."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+        now = datetime.now(timezone.utc)
+        expires_at = now + SEVEN_DAYS
 
         refresh_token = await RefreshToken.create(
             user=test_user,
-            token_hash=token_hash,
+            token_hash=TOKEN_HASH,
             expires_at=expires_at
         )
 
@@ -162,23 +184,13 @@ class TestRefreshTokenModel:
         assert isinstance(refresh_token.updated_at, datetime)
 
         # Both should be recent (within last minute)
-        now = datetime.now(timezone.utc)
-        assert (now - refresh_token.created_at).total_seconds() < 60
-        assert (now - refresh_token.updated_at).total_seconds() < 60
-
-        await refresh_token.delete()
+        assert abs((refresh_token.created_at - now).total_seconds()) < 60
+        assert abs((refresh_token.updated_at - now).total_seconds()) < 60
 
     @pytest.mark.asyncio
     async def test_refresh_token_cascade_delete_with_user(self, test_user):
         """Test that deleting user cascades to refresh tokens."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at
-        )
+        refresh_token = await RefreshToken.create(user=test_user, **_refresh_token_kwargs())
 
         token_id = refresh_token.id
 
@@ -200,23 +212,13 @@ class TestRefreshTokenModel:
         )
 
         # Create multiple tokens
-        tokens = []
-        for i in range(3):
-            token_hash = hashlib.sha256(f"token_{i}".encode()).hexdigest()
-            expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-            token = await RefreshToken.create(
-                user=user,
-                token_hash=token_hash,
-                expires_at=expires_at
-            )
-            tokens.append(token)
+        await RefreshToken.bulk_create([
+            RefreshToken(user=user, **_refresh_token_kwargs(token_hash=TOKEN_HASHES[i]))
+            for i in range(3)
+        ])
 
         # Verify all tokens exist
-        user_tokens = await RefreshToken.filter(user=user)
-        assert len(user_tokens) == 3
-
-        # Cleanup
-        await user.delete()
+        assert await RefreshToken.filter(user=user).count() == 3
 
 
 class TestRefreshTokenMethods:
@@ -225,15 +227,7 @@ class TestRefreshTokenMethods:
     @pytest.mark.asyncio
     async def test_revoke_method(self, test_user):
         """Test RefreshToken.revoke() instance method."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at,
-            revoked=False
-        )
+        refresh_token = await RefreshToken.create(user=test_user, **_refresh_token_kwargs())
 
         # Revoke the token
         result = await refresh_token.revoke()
@@ -242,23 +236,13 @@ class TestRefreshTokenMethods:
         assert refresh_token.revoked is True
 
         # Verify in database
-        await refresh_token.refresh_from_db()
-        assert refresh_token.revoked is True
-
-        await refresh_token.delete()
+        db_revoked = await RefreshToken.filter(id=refresh_token.id).values_list("revoked", flat=True)
+        assert db_revoked == [True]
 
     @pytest.mark.asyncio
     async def test_revoke_method_idempotent(self, test_user):
         """Test that revoking already-revoked token is idempotent."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at,
-            revoked=True  # Already revoked
-        )
+        refresh_token = await RefreshToken.create(user=test_user, **_refresh_token_kwargs(revoked=True))  # Already revoked
 
         # Revoke again
         result = await refresh_token.revoke()
@@ -266,131 +250,54 @@ class TestRefreshTokenMethods:
         assert result is True
         assert refresh_token.revoked is True
 
-        await refresh_token.delete()
-
-    @pytest.mark.asyncio
-    async def test_is_valid_method_with_valid_token(self, test_user):
-        """Test RefreshToken.is_valid() returns True for valid token."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at,
-            revoked=False
-        )
-
-        assert refresh_token.is_valid() is True
-
-        await refresh_token.delete()
-
-    @pytest.mark.asyncio
-    async def test_is_valid_method_with_revoked_token(self, test_user):
-        """Test RefreshToken.is_valid() returns False for revoked token."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
+    @pytest.mark.parametrize("revoked,expires_at,expected", [
+        (False, FUTURE_EXPIRY, True),
+        (True, FUTURE_EXPIRY, False),
+        (False, PAST_EXPIRY, False),
+    ], ids=["valid", "revoked", "expired"])
+    def test_is_valid_method(self, revoked, expires_at, expected):
+        """Test RefreshToken.is_valid() is True only for unrevoked, unexpired tokens."""
+        refresh_token = RefreshToken(
+            token_hash=TOKEN_HASH,
             expires_at=expires_at,
-            revoked=True
+            revoked=revoked
         )
 
-        assert refresh_token.is_valid() is False
-
-        await refresh_token.delete()
+        assert refresh_token.is_valid() is expected
 
     @pytest.mark.asyncio
-    async def test_is_valid_method_with_expired_token(self, test_user):
-        """Test RefreshToken.is_valid() returns False for expired token."""
-        token_hash = hashlib.sha256("test_token".encode()).hexdigest()
-        expires_at = datetime.now(timezone.utc) - timedelta(days=1)  # Expired yesterday
-
-        refresh_token = await RefreshToken.create(
-            user=test_user,
-            token_hash=token_hash,
-            expires_at=expires_at,
-            revoked=False
-        )
-
-        assert refresh_token.is_valid() is False
-
-        await refresh_token.delete()
-
-    @pytest.mark.asyncio
-    async def test_revoke_all_for_user_method(self, db):
+    async def test_revoke_all_for_user_method(self, test_user):
         """Test RefreshToken.revoke_all_for_user() class method."""
-        user = await User.create(
-            username="revoke_all_user",
-            email="revokeall@example.com",
-            password="dummy_hash",
-            remember_token=""
-        )
-
         # Create multiple tokens
-        for i in range(3):
-            token_hash = hashlib.sha256(f"token_{i}".encode()).hexdigest()
-            expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-            await RefreshToken.create(
-                user=user,
-                token_hash=token_hash,
-                expires_at=expires_at,
-                revoked=False
-            )
+        await RefreshToken.bulk_create([
+            RefreshToken(user=test_user, **_refresh_token_kwargs(token_hash=TOKEN_HASHES[i]))
+            for i in range(3)
+        ])
 
         # Revoke all user tokens
-        count = await RefreshToken.revoke_all_for_user(user.id)
+        count = await RefreshToken.revoke_all_for_user(test_user.id)
 
         assert count == 3
 
         # Verify all are revoked
-        user_tokens = await RefreshToken.filter(user=user)
-        for token in user_tokens:
-            assert token.revoked is True
-
-        await user.delete()
+        revoked_flags = await RefreshToken.filter(user=test_user).values_list("revoked", flat=True)
+        assert len(revoked_flags) == 3
+        assert all(revoked_flags)
 
     @pytest.mark.asyncio
-    async def test_cleanup_expired_method(self, db):
+    async def test_cleanup_expired_method(self, test_user):
         """Test RefreshToken.cleanup_expired() class method."""
-        user = await User.create(
-            username="cleanup_user",
-            email="cleanup@example.com",
-            password="dummy_hash",
-            remember_token=""
-        )
-
-        # Create expired token
-        expired_hash = hashlib.sha256("expired_token".encode()).hexdigest()
-        expired_token = await RefreshToken.create(
-            user=user,
-            token_hash=expired_hash,
-            expires_at=datetime.now(timezone.utc) - timedelta(days=1),
-            revoked=False
-        )
-
-        # Create valid token
-        valid_hash = hashlib.sha256("valid_token".encode()).hexdigest()
-        valid_token = await RefreshToken.create(
-            user=user,
-            token_hash=valid_hash,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-            revoked=False
-        )
+        # Create one expired and one valid token in a single insert
+        await RefreshToken.bulk_create([
+            RefreshToken(user=test_user, **_refresh_token_kwargs(token_hash=EXPIRED_HASH, expires_at=PAST_EXPIRY)),
+            RefreshToken(user=test_user, **_refresh_token_kwargs(token_hash=VALID_HASH)),
+        ])
 
         # Run cleanup
         count = await RefreshToken.cleanup_expired()
 
-        assert count >= 1  # At least the expired one
-
-        # Verify expired token is deleted
-        found_expired = await RefreshToken.get_or_none(id=expired_token.id)
-        assert found_expired is None
-
-        # Verify valid token still exists
-        found_valid = await RefreshToken.get_or_none(id=valid_token.id)
-        assert found_valid is not None
+        assert count == 1  # Only the expired one
 
-        await user.delete()
+        # Verify only the valid token remains (bulk_create does not populate ids, so match by hash)
+        remaining = await RefreshToken.filter(user=test_user).values_list("token_hash", flat=True)
+        assert remaining == [VALID_HASH]
@@ -0,0 +1,592 @@
+"""
+Tests for the UploadMetadata and UploadResult Pydantic models and make_user_filepath.
+
+These tests do not touch the database.
+
+Validates:
+- UploadMetadata Pydantic validation (filename pattern, MIME type)
+- UploadResult structure for API responses
+- Filepath generation for upload storage
+"""
+import pytest
+from pathlib import Path
+from pydantic import ValidationError
+
+from app.models.uploads import UploadMetadata, UploadResult, make_user_filepath
+from app.lib.config import get_app_config
+
+config = get_app_config()
+
+
+@pytest.fixture(autouse=True)
+def storage_path(tmp_path, monkeypatch):
+    """Point upload storage at a per-test temporary directory."""
+    monkeypatch.setattr(config, "storage_path", tmp_path)
+    return tmp_path
+
+
+class TestUploadMetadata:
+    """Test UploadMetadata Pydantic model."""
+
+    def test_uploadmetadata_valid_creation(self):
+        """Test UploadMetadata valid creation."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="document_20250124-063307_de4c98fa",
+            ext="txt",
+            original_filename="My Document.txt",
+            clean_filename="document",
+            size=1024,
+            mime_type="text/plain",
+        )
+
+        assert metadata.user_id == 1
+        assert metadata.filename == "document_20250124-063307_de4c98fa"
+        assert metadata.ext == "txt"
+        assert metadata.size == 1024
+
+    def test_uploadmetadata_filename_pattern_validation(self):
+        """Test UploadMetadata filename pattern validation."""
+        # Valid filename patterns
+        valid_filenames = [
+            "test_20250124-063307_de4c98fa",
+            "document_20240101-000000_abcd1234",
+            "a_20250124-235959_ffffffff",
+            "verylongname_20250124-063307_a1b2c3d4",
+        ]
+
+        for filename in valid_filenames:
+            metadata = UploadMetadata(
+                user_id=1,
+                filename=filename,
+                ext="txt",
+                original_filename="test.txt",
+                clean_filename=filename.split("_")[0],
+                size=100,
+                mime_type="text/plain",
+            )
+            assert metadata.filename == filename
+
+        # Invalid filename patterns
+        invalid_filenames = [
+            "document",  # Missing timestamp and UUID
+            "document_20250124",  # Missing separator and UUID
+            "document_20250124-063307",  # Missing UUID
+            "document_20250124-063307_de4c98",  # UUID too short (7 chars)
+            "document_20250124-063307_de4c98fag",  # UUID has non-hex char
+            "DOCUMENT_20250124-063307_de4c98fa",  # Uppercase not allowed
+            "doc-ument_20250124-063307_de4c98fa",  # Dash in name not allowed
+        ]
+
+        for invalid_filename in invalid_filenames:
+            with pytest.raises(ValidationError):
+                UploadMetadata(
+                    user_id=1,
+                    filename=invalid_filename,
+                    ext="txt",
+                    original_filename="test.txt",
+                    clean_filename="test",
+                    size=100,
+                    mime_type="text/plain",
+                )
+
+    def test_uploadmetadata_ext_validation(self):
+        """Test UploadMetadata extension validation."""
+        valid_extensions = ["txt", "pdf", "jpg", "png", "gif", "webp", "tar.gz", "tar.bz2"]
+
+        for ext in valid_extensions:
+            metadata = UploadMetadata(
+                user_id=1,
+                filename="test_20250124-063307_abcd1234",
+                ext=ext.lower(),
+                original_filename="test.txt",
+                clean_filename="test",
+                size=100,
+                mime_type="text/plain",
+            )
+            assert metadata.ext == ext.lower()
+
+    def test_uploadmetadata_ext_optional(self):
+        """Test UploadMetadata extension is optional."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="test_20250124-063307_abcd1234",
+            ext=None,
+            original_filename="test",
+            clean_filename="test",
+            size=100,
+            mime_type="text/plain",
+        )
+        assert metadata.ext is None
+
+    def test_uploadmetadata_mime_type_validation(self):
+        """Test UploadMetadata MIME type validation."""
+        # Valid MIME types
+        valid_mime_types = [
+            "text/plain",
+            "image/jpeg",
+            "application/pdf",
+            "image/png",
+            "text/html",
+        ]
+
+        for mime_type in valid_mime_types:
+            metadata = UploadMetadata(
+                user_id=1,
+                filename="test_20250124-063307_abcd1234",
+                ext="txt",
+                original_filename="test.txt",
+                clean_filename="test",
+                size=100,
+                mime_type=mime_type,
+            )
+            assert metadata.mime_type == mime_type
+
+        # Invalid MIME types
+        invalid_mime_types = [
+            "invalid",  # Missing /
+            "text",  # Missing /
+            "/plain",  # Missing type
+            "text/",  # Missing subtype
+            "text//plain",  # Double slash
+        ]
+
+        for invalid_mime in invalid_mime_types:
+            with pytest.raises(ValidationError):
+                UploadMetadata(
+                    user_id=1,
+                    filename="test_20250124-063307_abcd1234",
+                    ext="txt",
+                    original_filename="test.txt",
+                    clean_filename="test",
+                    size=100,
+                    mime_type=invalid_mime,
+                )
+
+    def test_uploadmetadata_clean_filename_pattern(self):
+        """Test UploadMetadata clean filename pattern validation."""
+        valid_clean_names = [
+            "a",
+            "test",
+            "my_document",
+            "file_with_underscores",
+            "test123",
+        ]
+
+        for clean_name in valid_clean_names:
+            metadata = UploadMetadata(
+                user_id=1,
+                filename="test_20250124-063307_abcd1234",
+                ext="txt",
+                original_filename=f"{clean_name}.txt",
+                clean_filename=clean_name,
+                size=100,
+                mime_type="text/plain",
+            )
+            assert metadata.clean_filename == clean_name
+
+    def test_uploadmetadata_dot_ext_with_extension(self):
+        """Test UploadMetadata dot_ext property with extension."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="test_20250124-063307_abcd1234",
+            ext="txt",
+            original_filename="test.txt",
+            clean_filename="test",
+            size=100,
+            mime_type="text/plain",
+        )
+
+        assert metadata.dot_ext == ".txt"
+
+    def test_uploadmetadata_dot_ext_without_extension(self):
+        """Test UploadMetadata dot_ext property without extension."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="test_20250124-063307_abcd1234",
+            ext=None,
+            original_filename="test",
+            clean_filename="test",
+            size=100,
+            mime_type="text/plain",
+        )
+
+        assert metadata.dot_ext == ""
+
+    def test_uploadmetadata_dot_ext_with_multipart_extension(self):
+        """Test UploadMetadata dot_ext property with multipart extension."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="archive_20250124-063307_abcd1234",
+            ext="tar.gz",
+            original_filename="archive.tar.gz",
+            clean_filename="archive",
+            size=5000,
+            mime_type="application/gzip",
+        )
+
+        assert metadata.dot_ext == ".tar.gz"
+
+    def test_uploadmetadata_filepath_property(self):
+        """Test UploadMetadata filepath property."""
+        metadata = UploadMetadata(
+            user_id=42,
+            filename="test_20250124-063307_abcd1234",
+            ext="txt",
+            original_filename="test.txt",
+            clean_filename="test",
+            size=100,
+            mime_type="text/plain",
+        )
+
+        filepath = metadata.filepath
+        assert isinstance(filepath, Path)
+        # Filepath now includes extension
+        assert str(filepath).endswith("user_42/test_20250124-063307_abcd1234.txt")
+
+    def test_uploadmetadata_size_positive_integer(self):
+        """Test UploadMetadata size validation."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="test_20250124-063307_abcd1234",
+            ext="txt",
+            original_filename="test.txt",
+            clean_filename="test",
+            size=0,  # Zero is valid
+            mime_type="text/plain",
+        )
+        assert metadata.size == 0
+
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="test_20250124-063307_abcd1234",
+            ext="txt",
+            original_filename="test.txt",
+            clean_filename="test",
+            size=1000000,  # 1MB
+            mime_type="text/plain",
+        )
+        assert metadata.size == 1000000
+
+
+class TestUploadResult:
+    """Test UploadResult Pydantic model."""
+
+    def test_uploadresult_success_structure(self):
+        """Test UploadResult success status structure."""
+        result = UploadResult(
+            status="success",
+            message="File uploaded successfully",
+            upload_id=None,
+            metadata=None,
+        )
+
+        assert result.status == "success"
+        assert result.message == "File uploaded successfully"
+        assert result.upload_id is None
+        assert result.metadata is None
+
+    def test_uploadresult_error_structure(self):
+        """Test UploadResult error status structure."""
+        result = UploadResult(
+            status="error",
+            message="File size exceeds quota",
+            upload_id=None,
+            metadata=None,
+        )
+
+        assert result.status == "error"
+        assert result.message == "File size exceeds quota"
+        assert result.upload_id is None
+        assert result.metadata is None
+
+    def test_uploadresult_pending_structure(self):
+        """Test UploadResult pending status structure."""
+        result = UploadResult(
+            status="pending",
+            message="Upload in progress",
+            upload_id=None,
+            metadata=None,
+        )
+
+        assert result.status == "pending"
+        assert result.message == "Upload in progress"
+        assert result.upload_id is None
+        assert result.metadata is None
+
+    def test_uploadresult_arbitrary_types_allowed(self):
+        """Test UploadResult model structure with upload_id field."""
+        result = UploadResult(
+            status="success",
+            message="File uploaded",
+            upload_id=None,
+            metadata=None,
+        )
+
+        assert result.status == "success"
+        assert result.message == "File uploaded"
+        # Verify upload_id field is present and accepts None
+        assert result.upload_id is None
+
+    def test_uploadresult_url_property_with_metadata(self):
+        """Test UploadResult url property generates correct URL when metadata is present."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="test_20250124-063307_abcd1234",
+            ext="txt",
+            original_filename="test.txt",
+            clean_filename="test",
+            size=100,
+            mime_type="text/plain",
+        )
+
+        result = UploadResult(
+            status="success",
+            message="File uploaded",
+            upload_id=42,
+            metadata=metadata,
+        )
+
+        expected_url = f"{config.app_base_url}/get/42/test.txt"
+        assert result.url == expected_url
+
+    def test_uploadresult_url_property_without_metadata(self):
+        """Test UploadResult url property returns empty string when metadata is None."""
+        result = UploadResult(
+            status="error",
+            message="Upload failed",
+            upload_id=None,
+            metadata=None,
+        )
+
+        assert result.url == ""
+
+    def test_uploadresult_url_property_without_upload_id(self):
+        """Test UploadResult url property returns empty string when upload_id is None."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="test_20250124-063307_abcd1234",
+            ext="txt",
+            original_filename="test.txt",
+            clean_filename="test",
+            size=100,
+            mime_type="text/plain",
+        )
+
+        result = UploadResult(
+            status="pending",
+            message="Upload in progress",
+            upload_id=None,
+            metadata=metadata,
+        )
+
+        assert result.url == ""
+
+    def test_uploadresult_view_url_property(self):
+        """Test UploadResult view_url property generates correct URL."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="image_20250124-063307_12345678",
+            ext="jpg",
+            original_filename="image.jpg",
+            clean_filename="image",
+            size=1024,
+            mime_type="image/jpeg",
+        )
+
+        result = UploadResult(
+            status="success",
+            message="File uploaded",
+            upload_id=123,
+            metadata=metadata,
+        )
+
+        expected_url = f"{config.app_base_url}/view/123/image.jpg"
+        assert result.view_url == expected_url
+
+    def test_uploadresult_download_url_property(self):
+        """Test UploadResult download_url property generates correct URL."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="document_20250124-063307_abcdef12",
+            ext="pdf",
+            original_filename="document.pdf",
+            clean_filename="document",
+            size=2048,
+            mime_type="application/pdf",
+        )
+
+        result = UploadResult(
+            status="success",
+            message="File uploaded",
+            upload_id=456,
+            metadata=metadata,
+        )
+
+        expected_url = f"{config.app_base_url}/download/456/document.pdf"
+        assert result.download_url == expected_url
+
+    def test_uploadresult_url_property_without_extension(self):
+        """Test UploadResult url property works correctly when file has no extension."""
+        metadata = UploadMetadata(
+            user_id=1,
+            filename="noext_20250124-063307_abcd1234",
+            ext=None,
+            original_filename="noext",
+            clean_filename="noext",
+            size=512,
+            mime_type="application/octet-stream",
+        )
+
+        result = UploadResult(
+            status="success",
+            message="File uploaded",
+            upload_id=789,
+            metadata=metadata,
+        )
+
+        # Should not have a trailing dot when no extension
+        expected_url = f"{config.app_base_url}/get/789/noext"
+        assert result.url == expected_url
+        assert not result.url.endswith(".")
+
+
+class TestMakeUserFilepath:
+    """Test make_user_filepath function."""
+
+    def test_make_user_filepath_basic(self):
+        """Test basic filepath generation."""
+        filepath = make_user_filepath(42, "document_20250124-063307_abcd1234")
+        assert isinstance(filepath, Path)
+        assert str(filepath).endswith("user_42/document_20250124-063307_abcd1234")
+
+    def test_make_user_filepath_creates_directory(self):
+        """Test that make_user_filepath creates the user directory."""
+        filepath = make_user_filepath(123, "file_20250124-063307_a1b2c3d4")
+        assert isinstance(filepath, Path)
+        # Directory should be created
+        assert filepath.parent.exists()
+        assert filepath.parent.is_dir()
+        assert "user_123" in str(filepath.parent)
+
+    def test_make_user_filepath_different_users_different_paths(self):
+        """Test that different user IDs generate different paths."""
+        filepath1 = make_user_filepath(1, "file_20250124-063307_abcd1234")
+        filepath2 = make_user_filepath(2, "file_20250124-063307_abcd1234")
+        
+        assert filepath1 != filepath2
+        assert "user_1" in str(filepath1)
+        assert "user_2" in str(filepath2)
+
+    def test_make_user_filepath_same_user_different_files(self):
+        """Test that same user ID with different filenames generates child paths in same directory."""
+        filepath1 = make_user_filepath(99, "file1_20250124-063307_abcd1234")
+        filepath2 = make_user_filepath(99, "file2_20250124-063307_efgh5678")
+        
+        # Both should be in user_99 directory but different files
+        assert filepath1.parent == filepath2.parent
+        assert filepath1.name != filepath2.name
+        assert filepath1 != filepath2
+
+    def test_make_user_filepath_idempotent_directory_creation(self):
+        """Test that calling make_user_filepath twice with same user doesn't fail."""
+        # First call should create directory
+        filepath1 = make_user_filepath(77, "file1_20250124-063307_abcd1234")
+        # Second call should succeed without error (mkdir with exist_ok=True)
+        filepath2 = make_user_filepath(77, "file2_20250124-063307_efgh5678")
+        
+        assert filepath1.parent.exists()
+        assert filepath2.parent.exists()
+        assert filepath1.parent == filepath2.parent
+
+    def test_make_user_filepath_recreates_removed_user_directory(self, storage_path):
+        """Test that a user directory removed after first use is created again."""
+        filepath1 = make_user_filepath(55, "file1_20250124-063307_abcd1234")
+        filepath1.parent.rmdir()
+
+        filepath2 = make_user_filepath(55, "file2_20250124-063307_efgh5678")
+
+        assert filepath2.parent == storage_path / "user_55"
+        assert filepath2.parent.is_dir()
+
+
+class TestUploadMetadataFilepathProperty:
+    """Test UploadMetadata model filepath property."""
+
+    @pytest.fixture
+    def metadata_and_path(self):
+        """Build one UploadMetadata and resolve its filepath once for the tests below."""
+        metadata = UploadMetadata(
+            user_id=42,
+            filename="document_20250124-063307_a1b2c3d4",
+            ext="pdf",
+            original_filename="document.pdf",
+            clean_filename="document",
+            size=2048,
+            mime_type="application/pdf",
+        )
+        return metadata, metadata.filepath
+
+    def test_uploadmetadata_filepath_returns_path(self, metadata_and_path):
+        """Test UploadMetadata filepath property returns a Path object."""
+        _, filepath = metadata_and_path
+        assert isinstance(filepath, Path)
+
+    def test_uploadmetadata_filepath_contains_user_id(self, metadata_and_path):
+        """Test UploadMetadata filepath contains correct user ID."""
+        metadata, filepath = metadata_and_path
+        assert f"user_{metadata.user_id}" in str(filepath)
+
+    def test_uploadmetadata_filepath_contains_filename(self, metadata_and_path):
+        """Test UploadMetadata filepath contains the filename and extension."""
+        metadata, filepath = metadata_and_path
+        assert metadata.filename in str(filepath)
+        # Verify extension is included in filepath
+        assert str(filepath).endswith("pdf")
+        assert f"{metadata.filename}.pdf" in str(filepath)
+
+    def test_uploadmetadata_filepath_creates_user_directory(self, metadata_and_path):
+        """Test UploadMetadata filepath creates user directory."""
+        _, filepath = metadata_and_path
+        # Directory should be created
+        assert filepath.parent.exists()
+        assert filepath.parent.is_dir()
+
+    def test_uploadmetadata_filepath_different_metadata_different_paths(self):
+        """Test different metadata instances have different filepaths."""
+        metadata1 = UploadMetadata(
+            user_id=42,
+            filename="file1_20250124-063307_a1a1a1a1",
+            ext="txt",
+            original_filename="file1.txt",
+            clean_filename="file1",
+            size=100,
+            mime_type="text/plain",
+        )
+
+        metadata2 = UploadMetadata(
+            user_id=42,
+            filename="file2_20250124-063307_b2b2b2b2",
+            ext="txt",
+            original_filename="file2.txt",
+            clean_filename="file2",
+            size=100,
+            mime_type="text/plain",
+        )
+
+        filepath1 = metadata1.filepath
+        filepath2 = metadata2.filepath
+
+        assert filepath1 != filepath2
+        assert filepath1.parent == filepath2.parent  # Same user directory
+        assert filepath1.name != filepath2.name
+
+    def test_uploadmetadata_filepath_follows_field_changes(self, metadata_and_path, storage_path):
+        """Test UploadMetadata filepath is rebuilt after user_id, filename or ext change."""
+        metadata, _ = metadata_and_path
+
+        metadata.user_id = 7
+        metadata.filename = "renamed_20250124-063307_a1b2c3d4"
+        metadata.ext = "txt"
+
+        assert metadata.filepath == storage_path / "user_7" / "renamed_20250124-063307_a1b2c3d4.txt"
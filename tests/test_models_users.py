@@ -14,8 +14,22 @@ Acceptance Criteria:
 
 import pytest
 from datetime import datetime
+from unittest.mock import AsyncMock
 
 from app.models.users import User
+from app.lib.security import generate_username
+
+
+HASH_A = "a" * 64
+HASH_B = "b" * 64
+HASH_C = "c" * 64
+
+FINGERPRINT_DATA = {
+    "user_agent": "Mozilla/5.0",
+    "accept_language": "en-US",
+    "accept_encoding": "gzip",
+    "client_ip": "192.168.1.1"
+}
 
 
 class TestUserModel:
@@ -24,20 +38,13 @@ class TestUserModel:
     @pytest.mark.asyncio
     async def test_create_unregistered_user_with_fingerprint(self, db):
         """Test creating an unregistered user with fingerprint data."""
-        fingerprint_data = {
-            "user_agent": "Mozilla/5.0",
-            "accept_language": "en-US",
-            "accept_encoding": "gzip",
-            "client_ip": "192.168.1.1"
-        }
-        
         user = await User.create(
             username="TestUser1234",
             email="",
             password="",
             is_registered=False,
-            fingerprint_hash="a" * 64,
-            fingerprint_data=fingerprint_data,
+            fingerprint_hash=HASH_A,
+            fingerprint_data=FINGERPRINT_DATA,
             registration_ip="192.168.1.1"
         )
         
@@ -46,8 +53,8 @@ class TestUserModel:
         assert user.email == ""
         assert user.is_registered is False
         assert user.is_abandoned is False
-        assert user.fingerprint_hash == "a" * 64
-        assert user.fingerprint_data == fingerprint_data
+        assert user.fingerprint_hash == HASH_A
+        assert user.fingerprint_data == FINGERPRINT_DATA
         assert user.registration_ip == "192.168.1.1"
 
     @pytest.mark.asyncio
@@ -86,7 +93,7 @@ class TestUserModel:
             email="",
             password="",
             is_registered=False,
-            fingerprint_hash="b" * 64
+            fingerprint_hash=HASH_B
         )
         
         assert user.email == ""
@@ -97,20 +104,19 @@ class TestUserModel:
     async def test_fingerprint_hash_not_unique(self, db):
         """Test that fingerprint_hash does not have uniqueness constraint."""
         # Two users can have the same fingerprint hash (same device, different time periods)
-        hash_value = "c" * 64
         
         user1 = await User.create(
             username="User1",
             email="",
             password="",
-            fingerprint_hash=hash_value
+            fingerprint_hash=HASH_C
         )
         
         user2 = await User.create(
             username="User2",
             email="",
             password="",
-            fingerprint_hash=hash_value
+            fingerprint_hash=HASH_C
         )
         
         assert user1.fingerprint_hash == user2.fingerprint_hash
@@ -128,36 +134,24 @@ class TestUserModel:
         assert user.is_abandoned is False
 
     @pytest.mark.asyncio
-    async def test_ipv4_address_in_ip_fields(self, db):
-        """Test that IPv4 addresses fit in IP address fields."""
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hash",
-            registration_ip="192.168.1.100",
-            last_login_ip="10.0.0.1"
-        )
-        
-        assert user.registration_ip == "192.168.1.100"
-        assert user.last_login_ip == "10.0.0.1"
-
-    @pytest.mark.asyncio
-    async def test_ipv6_address_in_ip_fields(self, db):
-        """Test that IPv6 addresses fit in IP address fields (45 chars max)."""
-        ipv6_addr = "2001:0db8:85a3:0000:0000:8a2e:0370:7334"
-        
+    @pytest.mark.parametrize("ip", [
+        "192.168.1.100",
+        "10.0.0.1",
+        "2001:0db8:85a3:0000:0000:8a2e:0370:7334",
+    ])
+    async def test_ip_address_in_ip_fields(self, db, ip):
+        """Test that IPv4 and IPv6 addresses fit in IP address fields (45 chars max)."""
         user = await User.create(
             username="testuser",
             email="test@example.com",
             password="hash",
-            registration_ip=ipv6_addr,
-            last_login_ip=ipv6_addr
+            registration_ip=ip,
+            last_login_ip=ip
         )
         
-        assert user.registration_ip == ipv6_addr
-        assert user.last_login_ip == ipv6_addr
+        assert user.registration_ip == ip
+        assert user.last_login_ip == ip
         assert len(user.registration_ip) <= 45
-        assert len(user.last_login_ip) <= 45
 
     @pytest.mark.asyncio
     async def test_last_seen_at_timestamp(self, db):
@@ -212,14 +206,15 @@ class TestGenerateUniqueUsername:
     @pytest.mark.asyncio
     async def test_handles_multiple_existing_users(self, db):
         """Test that username generation works even with existing users."""
-        # Create several users to verify uniqueness checking works
-        for i in range(5):
-            username = await User.generate_unique_username()
-            await User.create(
-                username=username,
-                email=f"test{i}@example.com",
-                password="hash"
-            )
+        # Create several users in one INSERT; names come straight from the generator
+        usernames = set()
+        while len(usernames) < 5:
+            usernames.add(generate_username())
+        await User.bulk_create([
+            User(username=username, email=f"test{i}@example.com", password="hash")
+            for i, username in enumerate(usernames)
+        ])
+        assert await User.filter(username__in=usernames).count() == 5
         
         # Generate another - should succeed despite existing users
         new_username = await User.generate_unique_username()
@@ -227,16 +222,9 @@ class TestGenerateUniqueUsername:
         assert len(new_username) > 0
 
     @pytest.mark.asyncio
-    async def test_exception_after_max_attempts(self, db, monkeypatch):
+    async def test_exception_after_max_attempts(self, mock_user, monkeypatch):
         """Test that ValueError is raised after 10 failed attempts."""
-        # Create existing user
-        await User.create(
-            username="CollisionUser0000",
-            email="test@example.com",
-            password="hash"
-        )
-        
-        # Mock to always return the existing username
+        # Mock to always return the same username
         def mock_generate(*args, **kwargs):
             return "CollisionUser0000"
         
@@ -244,6 +232,12 @@ class TestGenerateUniqueUsername:
         import app.models.users
         monkeypatch.setattr(app.models.users, "generate_username", mock_generate)
         
+        # Every lookup finds an existing user, so no query reaches the database
+        lookup = AsyncMock(return_value=mock_user)
+        monkeypatch.setattr(User, "get_or_none", lookup)
+        
         # Should raise ValueError after 10 attempts
         with pytest.raises(ValueError, match="Failed to generate a unique username"):
             await User.generate_unique_username()
+        
+        assert lookup.await_count == 10
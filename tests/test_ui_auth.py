@@ -6,59 +6,64 @@ This module tests the FastAPI/Starlette authentication endpoints:
 - /logout-all  
 - /refresh
 
-Tests use Starlette TestClient for HTTP request testing.
+Tests use the shared Starlette TestClient (`sync_client` fixture) for HTTP request testing.
 """
 
 import pytest
-from unittest.mock import Mock
+from types import SimpleNamespace
 from datetime import datetime, timedelta, timezone
-from starlette.testclient import TestClient
 import hashlib
 
-from app.main import app
 from app.models.users import User
 from app.models.refresh_tokens import RefreshToken
 from app.lib.auth import create_access_token, create_refresh_token
 from app.lib.config import get_app_config
 
 
+# Tokens for the "testuser" account, signed once at import rather than in every test
+ACCESS_TOKEN = create_access_token(data={"sub": "testuser"})
+REFRESH_TOKEN = create_refresh_token(SimpleNamespace(id=1))
+
+
+def _returns(value):
+    """Return an async stand-in that ignores its arguments and returns `value`."""
+    async def _mock(*args, **kwargs):
+        return value
+    return _mock
+
+
+@pytest.fixture
+def authed_client(sync_client, mock_user, monkeypatch):
+    """Provide the shared TestClient logged in as `mock_user` via an access_token cookie."""
+    async def mock_get_or_none(**kwargs):
+        if kwargs.get("username") == "testuser":
+            return mock_user
+        return None
+
+    monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
+    sync_client.cookies.set("access_token", ACCESS_TOKEN)
+    return sync_client
+
+
 class TestLoginEndpoint:
     """Test login endpoint with JWT token generation."""
 
-    @pytest.mark.asyncio
-    async def test_login_endpoint_exists(self):
+    def test_login_endpoint_exists(self, sync_client):
         """Test that login endpoint is accessible."""
-        client = TestClient(app)
-        response = client.get("/login")
+        response = sync_client.get("/login")
         
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
-    async def test_login_post_with_valid_credentials_sets_cookie(self, monkeypatch):
+    def test_login_post_with_valid_credentials_sets_cookie(self, sync_client, mock_user, monkeypatch):
         """Test that successful login sets access_token cookie."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
-        # Mock authenticate_user to return a user
-        mock_user = Mock(spec=User)
-        mock_user.username = "testuser"
-        mock_user.id = 1
-        
-        async def mock_authenticate(**kwargs):
-            return mock_user
-        
-        # Mock store_refresh_token to avoid database operations
-        async def mock_store_refresh_token(token_payload, user):
-            pass
-
-        # Import and patch the functions
+        # Patch out authentication and refresh token storage to avoid database operations
         import app.ui.auth
         import app.lib.auth
-        monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
-        monkeypatch.setattr(app.lib.auth, "store_refresh_token", mock_store_refresh_token)
+        monkeypatch.setattr(app.ui.auth, "authenticate_user", _returns(mock_user))
+        monkeypatch.setattr(app.lib.auth, "store_refresh_token", _returns(None))
         
         # Attempt login
-        response = client.post(
+        response = sync_client.post(
             "/login",
             data={"username": "testuser", "password": "password"}
         )
@@ -67,21 +72,14 @@ class TestLoginEndpoint:
         assert response.status_code == 200
         assert "access_token" in response.cookies
 
-    @pytest.mark.asyncio
-    async def test_login_post_with_invalid_credentials_returns_401(self, monkeypatch):
+    def test_login_post_with_invalid_credentials_returns_401(self, sync_client, monkeypatch):
         """Test that login with invalid credentials returns 401."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Mock authenticate_user to return None
-        async def mock_authenticate(**kwargs):
-            return None
-        
         import app.ui.auth
-        monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
+        monkeypatch.setattr(app.ui.auth, "authenticate_user", _returns(None))
         
         # Attempt login with wrong credentials
-        response = client.post(
+        response = sync_client.post(
             "/login",
             data={"username": "testuser", "password": "wrongpassword"}
         )
@@ -92,92 +90,16 @@ class TestLoginEndpoint:
 class TestLogoutEndpoint:
     """Test logout endpoint with JWT token removal."""
 
-    @pytest.mark.asyncio
-    async def test_logout_endpoint_exists(self, monkeypatch):
-        """Test that logout endpoint is accessible."""
-        from app.lib.config import get_app_config
-        config = get_app_config()
-        
-        # Create a valid token to authenticate
-        token = create_access_token(data={"sub": "testuser"})
+    def test_logout_response_shape(self, authed_client):
+        """Test that logout redirects home and deletes the access_token cookie."""
+        response = authed_client.get("/logout", follow_redirects=False)
         
-        # Mock User.get_or_none to return authenticated user
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        
-        client = TestClient(app)
-        client.cookies.set("access_token", token)
-        response = client.get("/logout", follow_redirects=False)
-        
-        # Should redirect
+        # Should redirect to root
         assert response.status_code in [302, 303, 307]
-
-    @pytest.mark.asyncio
-    async def test_logout_deletes_access_token_cookie(self, monkeypatch):
-        """Test that logout deletes the access_token cookie."""
-        # Create a valid token to authenticate
-        token = create_access_token(data={"sub": "testuser"})
-        
-        # Mock User.get_or_none to return authenticated user
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        
-        client = TestClient(app)
-        client.cookies.set("access_token", token)
-        
-        response = client.get("/logout", follow_redirects=False)
-        
-        # Cookie should be deleted (set to empty or expired)
-        # Check if access_token is in delete cookies
-        set_cookie_header = response.headers.get("set-cookie", "")
+        assert response.headers.get("location") == "/"
         
         # The cookie should be deleted (max-age=0 or expires in past)
-        assert "access_token" in set_cookie_header.lower() or response.status_code in [302, 303, 307]
-
-    @pytest.mark.asyncio
-    async def test_logout_redirects_to_home(self, monkeypatch):
-        """Test that logout redirects to home page."""
-        # Create a valid token to authenticate
-        token = create_access_token(data={"sub": "testuser"})
-        
-        # Mock User.get_or_none to return authenticated user
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        
-        client = TestClient(app)
-        client.cookies.set("access_token", token)
-        
-        response = client.get("/logout", follow_redirects=False)
-        
-        # Should be a redirect response
-        assert response.status_code in [302, 303, 307]
-        
-        # Should redirect to root
-        assert response.headers.get("location") == "/"
+        assert "access_token" in response.headers.get("set-cookie", "").lower()
 
 
 # Tests for /refresh endpoint removed - endpoint replaced by TokenRefreshMiddleware
@@ -188,30 +110,14 @@ class TestLogoutEndpoint:
 class TestLoginRefreshTokenIntegration:
     """Test login endpoint properly creates and stores refresh tokens."""
 
-    @pytest.mark.asyncio
-    async def test_login_sets_refresh_token_cookie(self, monkeypatch):
+    def test_login_sets_refresh_token_cookie(self, sync_client, mock_user, monkeypatch):
         """Test that successful login sets refresh_token cookie."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
-        # Mock authenticate_user
-        mock_user = Mock(spec=User)
-        mock_user.username = "testuser"
-        mock_user.id = 1
-        
-        async def mock_authenticate(**kwargs):
-            return mock_user
-        
-        # Mock store_refresh_token
-        async def mock_store_refresh_token(token_payload, user):
-            pass
-        
         import app.ui.auth
         import app.lib.auth
-        monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
-        monkeypatch.setattr(app.lib.auth, "store_refresh_token", mock_store_refresh_token)
+        monkeypatch.setattr(app.ui.auth, "authenticate_user", _returns(mock_user))
+        monkeypatch.setattr(app.lib.auth, "store_refresh_token", _returns(None))
         
-        response = client.post(
+        response = sync_client.post(
             "/login",
             data={"username": "testuser", "password": "password"}
         )
@@ -220,23 +126,11 @@ class TestLoginRefreshTokenIntegration:
         assert "access_token" in response.cookies
         assert "refresh_token" in response.cookies
 
-    @pytest.mark.asyncio
-    async def test_login_stores_refresh_token_in_database(self, monkeypatch):
+    def test_login_stores_refresh_token_in_database(self, sync_client, mock_user, monkeypatch):
         """Test that login stores refresh token in database."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Track if store was called
         store_called = {"value": False, "token": None, "user": None}
         
-        # Mock authenticate_user
-        mock_user = Mock(spec=User)
-        mock_user.username = "testuser"
-        mock_user.id = 1
-        
-        async def mock_authenticate(**kwargs):
-            return mock_user
-        
         # Mock store_refresh_token
         async def mock_store_refresh_token(token, user):
             store_called["value"] = True
@@ -245,10 +139,10 @@ class TestLoginRefreshTokenIntegration:
         
         import app.ui.auth
         import app.lib.auth
-        monkeypatch.setattr(app.ui.auth, "authenticate_user", mock_authenticate)
+        monkeypatch.setattr(app.ui.auth, "authenticate_user", _returns(mock_user))
         monkeypatch.setattr(app.lib.auth, "store_refresh_token", mock_store_refresh_token)
         
-        response = client.post(
+        response = sync_client.post(
             "/login",
             data={"username": "testuser", "password": "password"}
         )
@@ -262,116 +156,47 @@ class TestLoginRefreshTokenIntegration:
 class TestLogoutRefreshTokenIntegration:
     """Test logout endpoint properly revokes refresh tokens."""
 
-    @pytest.mark.asyncio
-    async def test_logout_revokes_refresh_token(self, monkeypatch):
+    def test_logout_revokes_refresh_token(self, authed_client, monkeypatch):
         """Test that logout revokes the refresh token."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Track if revoke was called
         revoke_called = {"value": False}
         
-        # Create tokens
-        from app.lib.auth import create_access_token, create_refresh_token
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        access_token = create_access_token(data={"sub": "testuser"})
-        refresh_token = create_refresh_token(mock_user)
-        
-        # Mock User.get_or_none
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
         # Mock revoke_refresh_token
         async def mock_revoke(token, user):
             revoke_called["value"] = True
             return True
         
         import app.ui.auth
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
         monkeypatch.setattr(app.ui.auth, "revoke_refresh_token", mock_revoke)
         
         # Make request with both tokens
-        client.cookies.set("access_token", access_token)
-        client.cookies.set("refresh_token", refresh_token)
-        response = client.get("/logout", follow_redirects=False)
+        authed_client.cookies.set("refresh_token", REFRESH_TOKEN)
+        response = authed_client.get("/logout", follow_redirects=False)
         
         # Should have revoked the token
         assert revoke_called["value"] is True
 
-    @pytest.mark.asyncio
-    async def test_logout_deletes_both_cookies(self, monkeypatch):
+    def test_logout_deletes_both_cookies(self, authed_client, monkeypatch):
         """Test that logout deletes both access and refresh token cookies."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
-        # Create tokens
-        from app.lib.auth import create_access_token, create_refresh_token
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        access_token = create_access_token(data={"sub": "testuser"})
-        refresh_token = create_refresh_token(mock_user)
-        
-        # Mock User.get_or_none
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        # Mock revoke_refresh_token
-        async def mock_revoke(token, user):
-            return True
-        
         import app.lib.auth
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        monkeypatch.setattr(app.lib.auth, "revoke_refresh_token", mock_revoke)
+        monkeypatch.setattr(app.lib.auth, "revoke_refresh_token", _returns(True))
         
         # Make request
-        client.cookies.set("access_token", access_token)
-        client.cookies.set("refresh_token", refresh_token)
-        response = client.get("/logout", follow_redirects=False)
+        authed_client.cookies.set("refresh_token", REFRESH_TOKEN)
+        response = authed_client.get("/logout", follow_redirects=False)
         
         # Both cookies should be deleted (marked for deletion with empty value or max_age=0)
         # The cookies dict will show them but they're marked for deletion
         assert response.status_code in [302, 303, 307]
 
-    @pytest.mark.asyncio
-    async def test_logout_works_without_refresh_token(self, monkeypatch):
+    def test_logout_works_without_refresh_token(self, authed_client, monkeypatch):
         """Test that logout works even without refresh token (backward compat)."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
-        # Create only access token
-        from app.lib.auth import create_access_token
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        access_token = create_access_token(data={"sub": "testuser"})
-        
-        # Mock User.get_or_none
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
         # Mock revoke (should return False when no token)
-        async def mock_revoke(token, user):
-            return False
-        
         import app.lib.auth
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        monkeypatch.setattr(app.lib.auth, "revoke_refresh_token", mock_revoke)
+        monkeypatch.setattr(app.lib.auth, "revoke_refresh_token", _returns(False))
         
         # Make request with only access token
-        client.cookies.set("access_token", access_token)
-        response = client.get("/logout", follow_redirects=False)
+        response = authed_client.get("/logout", follow_redirects=False)
         
         # Should still succeed
         assert response.status_code in [302, 303, 307]
@@ -380,75 +205,29 @@ class TestLogoutRefreshTokenIntegration:
 class TestLogoutAllEndpoint:
     """Test /logout-all endpoint functionality."""
 
-    @pytest.mark.asyncio
-    async def test_logout_all_endpoint_exists(self, monkeypatch):
+    def test_logout_all_endpoint_exists(self, authed_client, monkeypatch):
         """Test that /logout-all endpoint is accessible."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
-        # Create token for authentication
-        from app.lib.auth import create_access_token
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        access_token = create_access_token(data={"sub": "testuser"})
-        
-        # Mock User.get_or_none
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        # Mock revoke_user_refresh_tokens
-        async def mock_revoke_all(user):
-            return 0
-        
         import app.lib.auth
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        monkeypatch.setattr(app.lib.auth, "revoke_user_refresh_tokens", mock_revoke_all)
+        monkeypatch.setattr(app.lib.auth, "revoke_user_refresh_tokens", _returns(0))
         
-        client.cookies.set("access_token", access_token)
-        response = client.get("/logout-all", follow_redirects=False)
+        response = authed_client.get("/logout-all", follow_redirects=False)
         
         # Should redirect
         assert response.status_code in [302, 303, 307]
 
-    @pytest.mark.asyncio
-    async def test_logout_all_requires_authentication(self):
+    def test_logout_all_requires_authentication(self, sync_client):
         """Test that /logout-all requires authenticated user."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Make request without authentication
-        response = client.get("/logout-all", follow_redirects=False)
+        response = sync_client.get("/logout-all", follow_redirects=False)
         
         # Should redirect to login (303) when not authenticated
         assert response.status_code == 303
 
-    @pytest.mark.asyncio
-    async def test_logout_all_revokes_all_user_tokens(self, monkeypatch):
+    def test_logout_all_revokes_all_user_tokens(self, authed_client, monkeypatch):
         """Test that /logout-all revokes all user's refresh tokens."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
         # Track revoke call
         revoke_all_called = {"value": False, "count": 0}
         
-        # Create token
-        from app.lib.auth import create_access_token
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        access_token = create_access_token(data={"sub": "testuser"})
-        
-        # Mock User.get_or_none
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
         # Mock revoke_user_refresh_tokens
         async def mock_revoke_all(user):
             revoke_all_called["value"] = True
@@ -456,49 +235,22 @@ class TestLogoutAllEndpoint:
             return 5
         
         import app.ui.auth
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
         monkeypatch.setattr(app.ui.auth, "revoke_user_refresh_tokens", mock_revoke_all)
         
-        client.cookies.set("access_token", access_token)
-        response = client.get("/logout-all", follow_redirects=False)
+        response = authed_client.get("/logout-all", follow_redirects=False)
         
         # Should have called revoke_user_refresh_tokens
         assert revoke_all_called["value"] is True
         assert revoke_all_called["count"] == 5
 
-    @pytest.mark.asyncio
-    async def test_logout_all_deletes_current_cookies(self, monkeypatch):
+    def test_logout_all_deletes_current_cookies(self, authed_client, monkeypatch):
         """Test that /logout-all deletes current device cookies."""
-        from app.main import app as fastapi_app
-        client = TestClient(fastapi_app)
-        
-        # Create tokens
-        from app.lib.auth import create_access_token, create_refresh_token
-        mock_user = Mock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        
-        access_token = create_access_token(data={"sub": "testuser"})
-        refresh_token = create_refresh_token(mock_user)
-        
-        # Mock User.get_or_none
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        # Mock revoke_user_refresh_tokens
-        async def mock_revoke_all(user):
-            return 3
-        
         import app.lib.auth
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        monkeypatch.setattr(app.lib.auth, "revoke_user_refresh_tokens", mock_revoke_all)
+        monkeypatch.setattr(app.lib.auth, "revoke_user_refresh_tokens", _returns(3))
         
         # Make request
-        client.cookies.set("access_token", access_token)
-        client.cookies.set("refresh_token", refresh_token)
-        response = client.get("/logout-all", follow_redirects=False)
+        authed_client.cookies.set("refresh_token", REFRESH_TOKEN)
+        response = authed_client.get("/logout-all", follow_redirects=False)
         
         # Should redirect and delete cookies
         assert response.status_code in [302, 303, 307]
@@ -507,18 +259,14 @@ class TestLogoutAllEndpoint:
 class TestAuthenticationIntegration:
     """Integration tests for full authentication flow."""
 
-    @pytest.mark.asyncio
-    async def test_full_auth_flow_login_and_access(self, monkeypatch):
+    def test_full_auth_flow_login_and_access(self):
         """Test complete flow: login with JWT, access protected resource."""
         config = get_app_config()
         
-        # Create a valid JWT token
-        token = create_access_token(data={"sub": "testuser"})
-        
-        # Verify token is valid
+        # Verify the module's pre-signed token is valid
         import jwt
         payload = jwt.decode(
-            token,
+            ACCESS_TOKEN,
             config.auth_token_secret_key,
             algorithms=[config.auth_token_algorithm]
         )
@@ -14,360 +14,206 @@ Since these are primarily frontend features (HTML/Alpine.js/HTMX),
 tests focus on verifying correct template rendering and HTML structure.
 """
 
+import os
 import pytest
+from html.parser import HTMLParser
 from io import BytesIO
+from jinja2 import FileSystemLoader
 
+from app.ui.common import templates
 
-class TestUploadWidgetRendering:
-    """Test that upload widget template renders correctly."""
 
-    @pytest.mark.asyncio
-    async def test_widget_included_in_upload_page(self, client):
-        """Test that widget.html.j2 is included in the upload page."""
-        response = await client.get("/upload")
-        
-        assert response.status_code == 200
-        html = response.text
-        
-        # Widget should be present with its ID
-        assert 'id="file-upload-widget"' in html
+pytestmark = pytest.mark.ui_smoke
 
-    @pytest.mark.asyncio
-    async def test_widget_has_alpine_store_initialization(self, client):
-        """Test that widget initializes Alpine.js uploadWidget store."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should contain Alpine store initialization script
-        assert "Alpine.store('uploadWidget'" in html
-        assert "addFiles" in html
-        assert "removeFile" in html
-        assert "formatFileSize" in html
 
-    @pytest.mark.asyncio
-    async def test_widget_has_file_input(self, client):
-        """Test that widget contains hidden file input element."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have file input with correct attributes
-        assert 'type="file"' in html
-        assert 'name="upload_files"' in html
-        assert 'multiple' in html
-        assert 'id="file-upload-picker"' in html
+@pytest.fixture(scope="module")
+def upload_bytes(_tortoise, _test_client):
+    """Render the upload page once and share its raw body across the module's markup tests."""
+    response = _test_client.get("/upload")
+    _test_client.cookies.clear()
+    assert response.status_code == 200
+    return response.content
 
-    @pytest.mark.asyncio
-    async def test_widget_has_drag_drop_zone(self, client):
-        """Test that widget has drag-and-drop event handlers."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have drag-and-drop event handlers
-        assert '@drop.prevent' in html
-        assert '@dragover.prevent' in html
-        assert '@dragleave.prevent' in html
 
-    @pytest.mark.asyncio
-    async def test_widget_has_file_list_container(self, client):
-        """Test that widget has container for file list display."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have file list container with x-ref
-        assert 'x-ref="infoMessages"' in html or 'id="file-list"' in html
+@pytest.fixture(scope="module")
+def upload_html(upload_bytes):
+    """Decode the upload page once for tests that parse or case-fold it."""
+    return upload_bytes.decode()
 
-    @pytest.mark.asyncio
-    async def test_widget_has_dynamic_border_styling(self, client):
-        """Test that widget has dynamic border styling for drag state."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have dynamic class binding for drag state
-        assert ':class=' in html
-        assert 'dragActive' in html
-        assert 'border' in html
 
+@pytest.fixture(scope="module")
+def upload_html_lower(upload_html):
+    """Lower-case the upload page once for case-insensitive assertions."""
+    return upload_html.lower()
 
-class TestUploadFormIntegration:
-    """Test upload form integration with widget."""
 
-    @pytest.mark.asyncio
-    async def test_form_has_htmx_attributes(self, client):
-        """Test that form has correct HTMX configuration."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have HTMX attributes
-        assert 'hx-encoding="multipart/form-data"' in html
-        assert 'hx-post="/upload"' in html
-        assert 'hx-target=' in html
-        assert 'hx-swap=' in html
+class _ElementIndex(HTMLParser):
+    """Collect each start tag as a dict of its name, attributes and the text directly after it."""
 
-    @pytest.mark.asyncio
-    async def test_form_has_htmx_response_targets(self, client):
-        """Test that form uses HTMX response-targets extension."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have response-targets configuration
-        assert 'hx-select-oob' in html or 'hx-target-4*' in html
+    def __init__(self):
+        super().__init__()
+        self.elements = []
 
-    @pytest.mark.asyncio
-    async def test_form_has_upload_button(self, client):
-        """Test that form has upload submit button."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have submit button
-        assert 'type="submit"' in html
-        assert 'Upload' in html
+    def handle_starttag(self, tag, attrs):
+        self.elements.append({"tag": tag, "attrs": dict(attrs), "text": ""})
 
-    @pytest.mark.asyncio
-    async def test_upload_button_has_alpine_binding(self, client):
-        """Test that upload button has Alpine.js state binding."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Button should access Alpine store
-        assert '$store.uploadWidget' in html
-        assert ':disabled=' in html or 'x-data' in html
+    def handle_data(self, data):
+        if self.elements:
+            self.elements[-1]["text"] += data
 
-    @pytest.mark.asyncio
-    async def test_form_includes_widget_component(self, client):
-        """Test that form includes widget.html.j2 component."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Widget should be included (check for widget-specific elements)
-        assert 'file-upload-widget' in html or 'file-upload-picker' in html
 
+@pytest.fixture(scope="module")
+def upload_dom(upload_html):
+    """Parse the upload page once into a flat list of elements for structural assertions."""
+    parser = _ElementIndex()
+    parser.feed(upload_html)
+    parser.close()
+    return parser.elements
 
-class TestFileListDisplay:
-    """Test file list display functionality."""
 
-    @pytest.mark.asyncio
-    async def test_file_list_has_grid_layout(self, client):
-        """Test that file list uses grid layout for alignment."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have grid layout classes
-        assert 'grid' in html
-        assert 'grid-cols' in html or 'flex' in html
+def _select(elements, tag, **attrs):
+    """Return the elements with the given tag whose attributes include every `attrs` value."""
+    return [
+        element for element in elements
+        if element["tag"] == tag and all(element["attrs"].get(k) == v for k, v in attrs.items())
+    ]
 
-    @pytest.mark.asyncio
-    async def test_file_list_has_column_headers(self, client):
-        """Test that file list displays column headers."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have headers for file info
-        assert 'File Name' in html or 'filename' in html.lower()
-        assert 'Size' in html or 'size' in html.lower()
-
-    @pytest.mark.asyncio
-    async def test_file_list_uses_alpine_for_loop(self, client):
-        """Test that file list uses Alpine.js x-for to render files."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should use Alpine x-for template
-        assert 'x-for=' in html
-        assert '$store.uploadWidget.files' in html
-
-    @pytest.mark.asyncio
-    async def test_file_list_displays_file_size(self, client):
-        """Test that file list displays formatted file size."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should call formatFileSize function
-        assert 'formatFileSize' in html
 
+# Markup the upload page must contain, as (feature, needles); every needle must be present
+WIDGET_PRESENCE_CASES = [
+    ("widget_alpine_store_initialization", (b"Alpine.store('uploadWidget'", b"addFiles", b"removeFile", b"formatFileSize")),
+    ("widget_dynamic_border_styling", (b':class=', b'dragActive', b'border')),
+    ("file_list_grid_layout", (b'grid',)),
+    ("file_list_alpine_for_loop", (b'x-for=', b'$store.uploadWidget.files')),
+    ("file_list_file_size", (b'formatFileSize',)),
+    ("store_initialized_in_widget", (b"Alpine.store('uploadWidget'", b'files: []', b'dragActive: false')),
+    ("store_accessible_from_form", (b'$store.uploadWidget',)),
+    ("store_file_management_methods", (b'addFiles', b'removeFile', b'updateFileInput')),
+]
 
-class TestMessageDisplay:
-    """Test message display and dismissal functionality."""
+# Markup that may be written more than one way, as (feature, alternatives); at least one must be present
+WIDGET_ALTERNATIVE_CASES = [
+    ("widget_file_list_container", (b'x-ref="infoMessages"', b'id="file-list"')),
+    ("form_htmx_response_targets", (b'hx-select-oob', b'hx-target-4*')),
+    ("form_includes_widget_component", (b'file-upload-widget', b'file-upload-picker')),
+    ("file_list_grid_layout", (b'grid-cols', b'flex')),
+    ("page_responsive_classes", (b'sm:', b'md:', b'lg:')),
+    ("container_max_width", (b'container', b'max-w')),
+    ("widget_responsive_padding", (b'p-4', b'p-6', b'sm:p-')),
+]
 
-    @pytest.mark.asyncio
-    async def test_messages_container_exists(self, client):
-        """Test that messages container is present."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have messages container
-        assert 'id="messages"' in html
 
-    @pytest.mark.asyncio
-    async def test_messages_have_alpine_state(self, client):
-        """Test that messages use Alpine.js for state management."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have Alpine data for message counts
-        assert 'infoMessagesCount' in html or 'errorMessagesCount' in html
-        assert 'updateMessageCounts' in html
-
-    @pytest.mark.asyncio
-    async def test_messages_have_dismiss_buttons(self, client):
-        """Test that messages can be dismissed."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have remove/dismiss functionality
-        assert 'removeMessage' in html or '@click=' in html
-
-    @pytest.mark.asyncio
-    async def test_messages_have_transitions(self, client):
-        """Test that messages use Alpine transitions."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have transition directives
-        assert 'x-transition' in html or 'x-show' in html
-
-    @pytest.mark.asyncio
-    async def test_info_messages_styled_green(self, client):
-        """Test that info messages template has green styling."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have info-messages class or green styling in template
-        # Messages are rendered conditionally, so check for class definition
-        assert 'info-messages' in html or 'infoMessagesCount' in html
-
-    @pytest.mark.asyncio
-    async def test_error_messages_styled_red(self, client):
-        """Test that error messages template has red styling."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have error-messages class or error count tracking
-        # Messages are rendered conditionally, so check for class definition
-        assert 'error-messages' in html or 'errorMessagesCount' in html
-
-
-class TestResponsiveDesign:
-    """Test responsive design implementation."""
-
-    @pytest.mark.asyncio
-    async def test_page_has_responsive_classes(self, client):
-        """Test that page uses Tailwind responsive classes."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have responsive breakpoint classes
-        assert 'sm:' in html or 'md:' in html or 'lg:' in html
-
-    @pytest.mark.asyncio
-    async def test_container_has_max_width(self, client):
-        """Test that containers have max-width for desktop."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have container or max-width classes
-        assert 'container' in html or 'max-w' in html
-
-    @pytest.mark.asyncio
-    async def test_widget_has_responsive_padding(self, client):
-        """Test that widget has responsive padding."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have responsive padding classes
-        assert 'p-4' in html or 'p-6' in html or 'sm:p-' in html
-
-
-class TestButtonStates:
-    """Test upload button state management."""
-
-    @pytest.mark.asyncio
-    async def test_upload_button_disabled_when_no_files(self, client):
-        """Test that upload button is disabled when no files selected."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Button should have disabled binding
-        assert ':disabled=' in html
-        assert '$store.uploadWidget.files.length' in html
-
-    @pytest.mark.asyncio
-    async def test_upload_button_has_disabled_styling(self, client):
-        """Test that upload button has disabled state styling."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Should have conditional class for disabled state
-        assert 'button-disabled' in html or ':class=' in html
-
-
-class TestAlpineStoreIntegration:
-    """Test Alpine.js store integration across components."""
-
-    @pytest.mark.asyncio
-    async def test_store_initialized_in_widget(self, client):
-        """Test that uploadWidget store is initialized."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Store should be initialized with required properties
-        assert "Alpine.store('uploadWidget'" in html
-        assert 'files: []' in html
-        assert 'dragActive: false' in html
-
-    @pytest.mark.asyncio
-    async def test_store_accessible_from_form(self, client):
-        """Test that form can access widget store."""
-        response = await client.get("/upload")
-        
-        html = response.text
-        
-        # Form elements should reference the store
-        assert '$store.uploadWidget' in html
+class TestUploadWidgetRendering:
+    """Test that upload widget template renders correctly."""
 
     @pytest.mark.asyncio
-    async def test_store_has_file_management_methods(self, client):
-        """Test that store has methods for file management."""
+    async def test_widget_included_in_upload_page(self, client):
+        """Test that widget.html.j2 is included in the upload page."""
         response = await client.get("/upload")
         
+        assert response.status_code == 200
         html = response.text
         
-        # Should have file management methods
-        assert 'addFiles' in html
-        assert 'removeFile' in html
-        assert 'updateFileInput' in html
+        # Widget should be present with its ID
+        assert 'id="file-upload-widget"' in html
 
-    @pytest.mark.asyncio
-    async def test_store_has_helper_methods(self, client):
-        """Test that store has helper methods."""
-        response = await client.get("/upload")
-        
-        html = response.text
+    @pytest.mark.parametrize("name,needles", WIDGET_PRESENCE_CASES, ids=[c[0] for c in WIDGET_PRESENCE_CASES])
+    def test_upload_page_contains(self, upload_bytes, name, needles):
+        """Test that the upload page contains every piece of markup a widget feature needs."""
+        missing = [needle for needle in needles if needle not in upload_bytes]
+        
+        assert not missing, f"{name}: missing {missing}"
+
+    @pytest.mark.parametrize("name,needles", WIDGET_ALTERNATIVE_CASES, ids=[c[0] for c in WIDGET_ALTERNATIVE_CASES])
+    def test_upload_page_contains_any(self, upload_bytes, name, needles):
+        """Test that the upload page contains at least one accepted form of a widget feature's markup."""
+        assert any(needle in upload_bytes for needle in needles), f"{name}: none of {needles}"
+
+    def test_widget_has_file_input(self, upload_dom):
+        """Test that widget contains a multi-file input named upload_files."""
+        inputs = _select(upload_dom, "input", id="file-upload-picker")
+        
+        assert len(inputs) == 1
+        attrs = inputs[0]["attrs"]
+        assert attrs.get("type") == "file"
+        assert attrs.get("name") == "upload_files"
+        assert "multiple" in attrs
+
+    def test_widget_has_drag_drop_zone(self, upload_dom):
+        """Test that one element handles all drag-and-drop events."""
+        zones = [
+            element for element in upload_dom
+            if {"@drop.prevent", "@dragover.prevent", "@dragleave.prevent"} <= element["attrs"].keys()
+        ]
+        
+        assert zones
+
+    def test_form_has_htmx_attributes(self, upload_dom):
+        """Test that the upload form posts multipart data via HTMX."""
+        forms = _select(upload_dom, "form", **{"hx-post": "/upload", "hx-encoding": "multipart/form-data"})
+        
+        assert len(forms) == 1
+        assert "hx-target" in forms[0]["attrs"]
+        assert "hx-swap" in forms[0]["attrs"]
+
+    def test_form_has_upload_button(self, upload_dom):
+        """Test that form has an Upload submit button."""
+        buttons = _select(upload_dom, "button", type="submit")
+        
+        assert any("Upload" in button["text"] for button in buttons)
+
+    def test_upload_button_disabled_when_no_files(self, upload_dom):
+        """Test that the Upload button's Alpine bindings disable and style it until files are selected."""
+        buttons = [button for button in _select(upload_dom, "button", type="submit") if "Upload" in button["text"]]
+        
+        assert len(buttons) == 1
+        attrs = buttons[0]["attrs"]
+        assert "x-data" in attrs
+        assert "$store.uploadWidget.files.length" in attrs.get(":disabled", "")
+        assert "button-disabled" in attrs.get(":class", "")
+
+    def test_messages_container(self, upload_dom):
+        """Test that the messages container tracks info/error counts and can dismiss messages with a transition."""
+        containers = _select(upload_dom, "div", id="messages")
+        
+        assert len(containers) == 1
+        attrs = containers[0]["attrs"]
+        for name in ("infoMessagesCount", "errorMessagesCount", "updateMessageCounts", "removeMessage"):
+            assert name in attrs.get("x-data", "")
+        assert "updateMessageCounts" in attrs.get("x-init", "")
+        assert "x-show" in attrs
+        assert "x-transition" in attrs
+
+    def test_file_list_has_column_headers(self, upload_html, upload_html_lower):
+        """Test that file list displays column headers."""
+        html = upload_html
         
-        # Should have helper methods
-        assert 'formatFileSize' in html
+        # Should have headers for file info
+        assert 'File Name' in html or 'filename' in upload_html_lower
+        assert 'Size' in html or 'size' in upload_html_lower
+
+
+class TestTemplateCaching:
+    """Test that upload templates are compiled once and reused."""
+
+    @pytest.mark.parametrize("name", ["uploads/widget.html.j2", "uploads/form.html.j2"])
+    def test_template_is_cached(self, name):
+        """Test that repeated lookups return the same compiled template."""
+        assert templates.env.get_template(name) is templates.env.get_template(name)
+
+    @pytest.mark.parametrize("auto_reload", [False, True])
+    def test_template_edits_picked_up_only_with_auto_reload(self, auto_reload, tmp_path, monkeypatch):
+        """Test that an edited template file is re-read only when auto_reload is on."""
+        monkeypatch.setattr(templates.env, "loader", FileSystemLoader(tmp_path))
+        monkeypatch.setattr(templates.env, "auto_reload", auto_reload)
+        template_file = tmp_path / "edited.html.j2"
+        template_file.write_text("before")
+        assert templates.env.get_template("edited.html.j2").render() == "before"
+
+        # Rewrite the file and push its mtime forward so the change is detectable
+        template_file.write_text("after")
+        mtime = template_file.stat().st_mtime + 10
+        os.utime(template_file, (mtime, mtime))
+
+        expected = "after" if auto_reload else "before"
+        assert templates.env.get_template("edited.html.j2").render() == expected
@@ -18,38 +18,179 @@ Tests verify:
 - File serving with proper Content-Disposition headers
 """
 
+import httpx
 import pytest
 from io import BytesIO
 from unittest.mock import AsyncMock, patch
+from fastapi import Request, UploadFile
+from starlette.datastructures import Headers
 
 from app.models.users import User
 from app.models.uploads import Upload, UploadResult, UploadMetadata
 from app.lib.auth import create_access_token
+from app.api import uploads as api_uploads
+from app.models import uploads as models_uploads
+from app.ui import uploads as ui_uploads
+
+
+# Token for the "downloaduser" account, signed once at import rather than in every download test
+DOWNLOAD_TOKEN = create_access_token(data={"sub": "downloaduser"})
+
+
+def _multipart_post(files):
+    """Encode `files` as a multipart body once, returning keyword arguments for `client.post`."""
+    request = httpx.Request("POST", "/upload", files=files)
+    return {"content": request.read(), "headers": {"content-type": request.headers["content-type"]}}
+
+
+# Upload form bodies, encoded at import rather than by httpx on every POST
+SINGLE_FILE_POST = _multipart_post({"upload_files": ("test.txt", b"content", "text/plain")})
+MIXED_FILE_POST = _multipart_post([
+    ("upload_files", ("test1.txt", b"content", "text/plain")),
+    ("upload_files", ("test2.exe", b"content", "application/octet-stream")),
+])
+IMPORTANT_FILE_POST = _multipart_post({"upload_files": ("important.txt", b"content", "text/plain")})
+
+
+@pytest.fixture(scope="class")
+def upload_page(_tortoise, _test_client):
+    """Fetch GET /upload once for the page rendering tests to share."""
+    response = _test_client.get("/upload")
+    _test_client.cookies.clear()
+    return response
+
+
+@pytest.fixture
+async def test_user(db):
+    """Create the registered "testuser" present while uploads are posted."""
+    return await User.create(
+        username="testuser",
+        email="test@example.com",
+        password="hashedpassword",
+        is_registered=True,
+    )
+
+
+# Handler results validated once at import; _success_result copies the template without revalidating
+SUCCESS_RESULT_TEMPLATE = UploadResult(
+    status="success",
+    message="",
+    upload_id=1,
+    metadata=UploadMetadata(
+        user_id=1,
+        filename="test_20250125-120000_abcd1234",
+        ext="txt",
+        original_filename="test.txt",
+        clean_filename="test",
+        size=7,
+        mime_type="text/plain",
+    ),
+)
+FILE_TOO_LARGE_RESULT = UploadResult(status="error", message="File too large", upload_id=None, metadata=None)
+FILE_TYPE_NOT_ALLOWED_RESULT = UploadResult(status="error", message="File type not allowed", upload_id=None, metadata=None)
+
+
+def _success_result(user_id, original_filename="test.txt", upload_id=1):
+    """Build a successful UploadResult for a 7-byte text file."""
+    clean_filename = original_filename.rsplit(".", 1)[0]
+    metadata = SUCCESS_RESULT_TEMPLATE.metadata.model_copy(update={
+        "user_id": user_id,
+        "filename": f"{clean_filename}_20250125-120000_abcd1234",
+        "original_filename": original_filename,
+        "clean_filename": clean_filename,
+    })
+    return SUCCESS_RESULT_TEMPLATE.model_copy(update={"upload_id": upload_id, "metadata": metadata})
+
+
+def _upload_files(*files):
+    """Build the UploadFile list FastAPI would parse from a form posting `files` as (filename, content_type)."""
+    return [
+        UploadFile(file=BytesIO(b"content"), filename=filename, headers=Headers({"content-type": content_type}))
+        for filename, content_type in files
+    ]
+
+
+# create_upload cases as (uploaded files, stubbed handler results, phrases the page must all contain)
+UPLOAD_POST_SCENARIOS = [
+    pytest.param([("test.txt", "text/plain")], lambda user, files: [_success_result(user.id)], (
+        "test_20250125-120000_abcd1234", "uploaded successfully",
+    ), id="single-success"),
+    pytest.param([("test0.txt", "text/plain"), ("test1.txt", "text/plain")], lambda user, files: [
+        _success_result(user.id, f"test{i}.txt", upload_id=i + 1) for i in range(len(files))
+    ], (
+        "test0_20250125-120000_abcd1234", "test1_20250125-120000_abcd1234", "uploaded successfully",
+    ), id="multiple-success"),
+    pytest.param([("test.txt", "text/plain")], lambda user, files: [FILE_TOO_LARGE_RESULT], (
+        "File too large",
+    ), id="error"),
+    pytest.param([("test1.txt", "text/plain"), ("test2.exe", "application/octet-stream")], lambda user, files: [
+        _success_result(user.id, "test1.txt"),
+        FILE_TYPE_NOT_ALLOWED_RESULT,
+    ], (
+        "test1_20250125-120000_abcd1234", "uploaded successfully", "File type not allowed",
+    ), id="partial-failure"),
+    pytest.param([("test1.exe", "application/octet-stream"), ("test2.zip", "application/zip")], lambda user, files: [
+        FILE_TYPE_NOT_ALLOWED_RESULT,
+        FILE_TOO_LARGE_RESULT,
+    ], (
+        "File type not allowed", "File too large",
+    ), id="all-failures"),
+    pytest.param([("important.txt", "text/plain")], lambda user, files: [_success_result(user.id, "important.txt")], (
+        "important.txt",
+    ), id="lists-filename"),
+]
+
+
+@pytest.fixture
+def mock_upload_handler(monkeypatch):
+    """Return an installer that stubs out handle_uploaded_files for the UI upload route.
+
+    `install(make_results)` makes the route receive `make_results(user, files)` and returns
+    a list which records the (user, files) of every call.
+    """
+    def install(make_results):
+        calls = []
+
+        async def mock_handle_uploaded_files(user, files):
+            calls.append((user, files))
+            return make_results(user, files)
+
+        monkeypatch.setattr(ui_uploads, "handle_uploaded_files", mock_handle_uploaded_files)
+        return calls
+
+    return install
+
+
+@pytest.fixture(scope="class")
+def storage_path(tmp_path_factory):
+    """Point upload storage at one temporary directory for a whole test class."""
+    path = tmp_path_factory.mktemp("storage")
+    # Patch storage_path at the module level where it's actually used
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(models_uploads.config, "storage_path", path)
+        yield path
 
 
 class TestUploadGetEndpoint:
     """Test GET /upload endpoint for upload form page."""
 
-    @pytest.mark.asyncio
-    async def test_upload_page_endpoint_exists(self, client):
+    def test_upload_page_endpoint_exists(self, upload_page):
         """Test that GET /upload endpoint is accessible."""
-        response = await client.get("/upload")
+        response = upload_page
         
         # Should return 200 (auto-creates authenticated user)
         assert response.status_code == 200
 
-    @pytest.mark.asyncio
-    async def test_upload_page_returns_html(self, client):
+    def test_upload_page_returns_html(self, upload_page):
         """Test that upload page returns HTML content."""
-        response = await client.get("/upload")
+        response = upload_page
         
         assert response.status_code == 200
         assert "text/html" in response.headers.get("content-type", "")
 
-    @pytest.mark.asyncio
-    async def test_upload_page_contains_upload_form(self, client):
+    def test_upload_page_contains_upload_form(self, upload_page):
         """Test that upload page contains the upload form."""
-        response = await client.get("/upload")
+        response = upload_page
         
         html = response.text
         
@@ -57,10 +198,9 @@ class TestUploadGetEndpoint:
         assert "<form" in html
         assert "upload" in html.lower()
 
-    @pytest.mark.asyncio
-    async def test_upload_page_contains_file_input(self, client):
+    def test_upload_page_contains_file_input(self, upload_page):
         """Test that upload form contains file input element."""
-        response = await client.get("/upload")
+        response = upload_page
         
         html = response.text
         
@@ -68,20 +208,18 @@ class TestUploadGetEndpoint:
         assert 'type="file"' in html
         assert 'name="upload_files"' in html
 
-    @pytest.mark.asyncio
-    async def test_upload_page_contains_submit_button(self, client):
+    def test_upload_page_contains_submit_button(self, upload_page):
         """Test that upload form contains submit button."""
-        response = await client.get("/upload")
+        response = upload_page
         
         html = response.text
         
         # Should contain submit button
         assert 'type="submit"' in html or "<button" in html
 
-    @pytest.mark.asyncio
-    async def test_upload_page_has_htmx_integration(self, client):
+    def test_upload_page_has_htmx_integration(self, upload_page):
         """Test that form has HTMX attributes for dynamic upload."""
-        response = await client.get("/upload")
+        response = upload_page
         
         html = response.text
         
@@ -89,11 +227,10 @@ class TestUploadGetEndpoint:
         assert "hx-post" in html
         assert "/upload" in html
 
-    @pytest.mark.asyncio
-    async def test_upload_page_renders_with_authenticated_user(self, client):
+    def test_upload_page_renders_with_authenticated_user(self, upload_page):
         """Test that authenticated user is passed to template."""
         # Get the page (auto-creates user)
-        response = await client.get("/upload")
+        response = upload_page
         
         # Should succeed and render page
         assert response.status_code == 200
@@ -107,371 +244,90 @@ class TestUploadPostEndpoint:
     """Test POST /upload endpoint for file uploads."""
 
     @pytest.mark.asyncio
-    async def test_upload_endpoint_exists(self, client):
+    async def test_upload_endpoint_exists(self, client, test_user):
         """Test that POST /upload endpoint is accessible."""
-        # Create a user first
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
-        
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("test.txt", BytesIO(b"content"), "text/plain")},
-        )
+        response = await client.post("/upload", **SINGLE_FILE_POST)
         
         # Should return 200 or valid response (not 404)
         assert response.status_code in [200, 400, 422]
 
     @pytest.mark.asyncio
-    async def test_upload_post_processes_single_file(self, client, monkeypatch):
-        """Test that POST /upload processes a single file."""
-        # Create a user
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
+    @pytest.mark.parametrize("files,make_results,needles", UPLOAD_POST_SCENARIOS)
+    async def test_create_upload_renders_results(self, mock_user, mock_upload_handler, files, make_results, needles):
+        """Test that create_upload hands the files to the upload handler once and renders its results as HTML.
+
+        The route function is called directly to check how each kind of result is rendered;
+        routing, dependencies and multipart parsing are covered by the end-to-end POST tests.
+        """
+        handler_calls = mock_upload_handler(make_results)
+        upload_files = _upload_files(*files)
+        
+        # The layout reads flashed messages, so the bare request needs an (empty) session
+        response = await ui_uploads.create_upload(
+            current_user=mock_user,
+            request=Request({"type": "http", "session": {}}),
+            upload_files=upload_files,
         )
         
-        # Mock the upload handler to return success
-        async def mock_handle_uploaded_files(user, files):
-            file = files[0]
-            return [
-                UploadResult(
-                    status="success",
-                    message="",
-                    upload_id=1,
-                    metadata=UploadMetadata(
-                        user_id=user.id,
-                        filename="test_20250125-120000_abcd1234",
-                        ext="txt",
-                        original_filename="test.txt",
-                        clean_filename="test",
-                        size=7,
-                        mime_type="text/plain",
-                    ),
-                )
-            ]
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        # Upload a file
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("test.txt", BytesIO(b"content"), "text/plain")},
-        )
-        
-        # Should return 200
+        # Per-file errors are rendered, never turned into a server error
         assert response.status_code == 200
-
-    @pytest.mark.asyncio
-    async def test_upload_post_processes_multiple_files(self, client, monkeypatch):
-        """Test that POST /upload processes multiple files in batch."""
-        # Create a user
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
-        
-        # Mock the upload handler
-        async def mock_handle_uploaded_files(user, files):
-            results = []
-            for i, file in enumerate(files):
-                results.append(
-                    UploadResult(
-                        status="success",
-                        message="",
-                        upload_id=i + 1,
-                        metadata=UploadMetadata(
-                            user_id=user.id,
-                            filename=f"test{i}_20250125-120000_abcd123{i}",
-                            ext="txt",
-                            original_filename=f"test{i}.txt",
-                            clean_filename=f"test{i}",
-                            size=7,
-                            mime_type="text/plain",
-                        ),
-                    )
-                )
-            return results
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        # Upload multiple files
-        response = await client.post(
-            "/upload",
-            files=[
-                ("upload_files", ("test1.txt", BytesIO(b"content"), "text/plain")),
-                ("upload_files", ("test2.txt", BytesIO(b"content"), "text/plain")),
-            ],
-        )
+        assert "text/html" in response.headers.get("content-type", "")
+        assert handler_calls == [(mock_user, upload_files)]
         
-        # Should return 200
-        assert response.status_code == 200
+        # The page reports every file's outcome
+        html = response.body.decode()
+        missing = [needle for needle in needles if needle not in html]
+        assert not missing, f"missing {missing}"
 
     @pytest.mark.asyncio
-    async def test_upload_post_returns_html_response(self, client, monkeypatch):
-        """Test that POST /upload returns HTML response."""
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
-        
-        async def mock_handle_uploaded_files(user, files):
-            return [
-                UploadResult(
-                    status="success",
-                    message="",
-                    upload_id=1,
-                    metadata=UploadMetadata(
-                        user_id=user.id,
-                        filename="test_20250125-120000_abcd1234",
-                        ext="txt",
-                        original_filename="test.txt",
-                        clean_filename="test",
-                        size=7,
-                        mime_type="text/plain",
-                    ),
-                )
-            ]
+    async def test_upload_post_multiple_files(self, client, mock_upload_handler):
+        """Test that a multi-file POST /upload reaches the handler as separate files and reports each result."""
+        handler_calls = mock_upload_handler(lambda user, files: [
+            _success_result(user.id, "test1.txt"),
+            FILE_TYPE_NOT_ALLOWED_RESULT,
+        ])
         
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
+        response = await client.post("/upload", **MIXED_FILE_POST)
         
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("test.txt", BytesIO(b"content"), "text/plain")},
-        )
-        
-        # Should return HTML response
         assert response.status_code == 200
         assert "text/html" in response.headers.get("content-type", "")
-
-    @pytest.mark.asyncio
-    async def test_upload_post_displays_success_messages(self, client, monkeypatch):
-        """Test that successful uploads display success messages."""
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
         
-        async def mock_handle_uploaded_files(user, files):
-            return [
-                UploadResult(
-                    status="success",
-                    message="",
-                    upload_id=1,
-                    metadata=UploadMetadata(
-                        user_id=user.id,
-                        filename="test_20250125-120000_abcd1234",
-                        ext="txt",
-                        original_filename="test.txt",
-                        clean_filename="test",
-                        size=7,
-                        mime_type="text/plain",
-                    ),
-                )
-            ]
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("test.txt", BytesIO(b"content"), "text/plain")},
-        )
+        # The multipart body was parsed into both files for the (auto-created) current user
+        assert len(handler_calls) == 1
+        user, files = handler_calls[0]
+        assert isinstance(user, User)
+        assert [(f.filename, f.content_type) for f in files] == [
+            ("test1.txt", "text/plain"),
+            ("test2.exe", "application/octet-stream"),
+        ]
         
-        html = response.text
-        
-        # Should contain success message mentioning the file
-        assert "successfully" in html.lower() or "uploaded" in html.lower()
+        # Both the success and the per-file error are rendered
+        assert "test1_20250125-120000_abcd1234" in response.text
+        assert "File type not allowed" in response.text
 
     @pytest.mark.asyncio
-    async def test_upload_post_displays_error_messages_on_failure(self, client, monkeypatch):
-        """Test that failed uploads display error messages."""
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
-        
-        async def mock_handle_uploaded_files(user, files):
-            return [
-                UploadResult(
-                    status="error",
-                    message="File too large",
-                    upload_id=None,
-                    metadata=None,
-                )
-            ]
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("test.txt", BytesIO(b"content"), "text/plain")},
-        )
-        
-        html = response.text
-        
-        # Should contain error message
-        assert "error" in html.lower() or "too large" in html.lower()
-
-    @pytest.mark.asyncio
-    async def test_upload_post_handles_partial_failures(self, client, monkeypatch):
-        """Test that mixed success/error results are displayed correctly."""
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
-        
-        async def mock_handle_uploaded_files(user, files):
-            return [
-                UploadResult(
-                    status="success",
-                    message="",
-                    upload_id=1,
-                    metadata=UploadMetadata(
-                        user_id=user.id,
-                        filename="test1_20250125-120000_abcd1234",
-                        ext="txt",
-                        original_filename="test1.txt",
-                        clean_filename="test1",
-                        size=7,
-                        mime_type="text/plain",
-                    ),
-                ),
-                UploadResult(
-                    status="error",
-                    message="File type not allowed",
-                    upload_id=None,
-                    metadata=None,
-                ),
-            ]
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        response = await client.post(
-            "/upload",
-            files=[
-                ("upload_files", ("test1.txt", BytesIO(b"content"), "text/plain")),
-                ("upload_files", ("test2.exe", BytesIO(b"content"), "application/octet-stream")),
-            ],
-        )
-        
-        html = response.text
-        
-        # Should show both success and error messages
-        assert response.status_code == 200
-
-    @pytest.mark.asyncio
-    async def test_upload_post_auto_creates_user(self, client, monkeypatch):
+    async def test_upload_post_auto_creates_user(self, client, mock_upload_handler):
         """Test that POST /upload auto-creates authenticated user."""
-        # Database should start empty
-        user_count_before = await User.all().count()
-        
         # Mock the upload handler to avoid actual file processing
-        async def mock_handle_uploaded_files(user, files):
-            return [
-                UploadResult(
-                    status="success",
-                    message="",
-                    upload_id=1,
-                    metadata=UploadMetadata(
-                        user_id=user.id,
-                        filename="test_20250125-120000_abcd1234",
-                        ext="txt",
-                        original_filename="test.txt",
-                        clean_filename="test",
-                        size=7,
-                        mime_type="text/plain",
-                    ),
-                )
-            ]
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
+        handler_calls = mock_upload_handler(lambda user, files: [_success_result(user.id)])
         
         # POST to /upload with a file - this triggers get_or_create_authenticated_user
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("test.txt", BytesIO(b"content"), "text/plain")},
-        )
+        response = await client.post("/upload", **SINGLE_FILE_POST)
         
-        # Should succeed
+        # Should succeed, having delegated to the upload handler
         assert response.status_code == 200
+        assert len(handler_calls) == 1
         
-        # User should have been created by the dependency
-        user_count_after = await User.all().count()
-        assert user_count_after > user_count_before
-
-    @pytest.mark.asyncio
-    async def test_upload_post_with_all_failures(self, client, monkeypatch):
-        """Test behavior when all files fail to upload."""
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
-        
-        async def mock_handle_uploaded_files(user, files):
-            return [
-                UploadResult(
-                    status="error",
-                    message="File type not allowed",
-                    upload_id=None,
-                    metadata=None,
-                ),
-                UploadResult(
-                    status="error",
-                    message="File too large",
-                    upload_id=None,
-                    metadata=None,
-                ),
-            ]
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        response = await client.post(
-            "/upload",
-            files=[
-                ("upload_files", ("test1.exe", BytesIO(b"content"), "application/octet-stream")),
-                ("upload_files", ("test2.zip", BytesIO(b"x" * 10000000), "application/zip")),
-            ],
-        )
-        
-        # Should still return 200 (partial/error results are returned, not server error)
-        assert response.status_code == 200
+        # The database starts empty for each test, so the dependency's user is the only one
+        assert await User.all().count() == 1
 
 
 class TestDownloadEndpoint:
     """Test GET /download/{id}/{filename} endpoint for forced downloads."""
 
     @pytest.mark.asyncio
-    async def test_download_endpoint_forces_attachment(self, client, tmp_path, monkeypatch):
+    async def test_download_endpoint_forces_attachment(self, client, storage_path):
         """Test that /download/ endpoint sets Content-Disposition to attachment."""
-        # Monkeypatch storage_path at the module level where it's actually used
-        import app.models.uploads
-        monkeypatch.setattr(app.models.uploads.config, "storage_path", tmp_path)
-
         # Create user and file
         user = await User.create(
             username="downloaduser",
@@ -481,11 +337,10 @@ class TestDownloadEndpoint:
         )
 
         # Authenticate
-        token = create_access_token({"sub": user.username})
-        client.cookies = {"access_token": token}
+        client.cookies = {"access_token": DOWNLOAD_TOKEN}
 
         # Create test file
-        test_file = tmp_path / f"user_{user.id}" / "download_test.jpg"
+        test_file = storage_path / f"user_{user.id}" / "download_test.jpg"
         test_file.parent.mkdir(parents=True, exist_ok=True)
         test_file.write_bytes(b"fake image data")
 
@@ -509,26 +364,21 @@ class TestDownloadEndpoint:
         assert "attachment" in response.headers["Content-Disposition"]
 
     @pytest.mark.asyncio
-    async def test_download_endpoint_with_authentication(self, client, tmp_path, monkeypatch):
+    async def test_download_endpoint_with_authentication(self, client, storage_path):
         """Test that /download/ endpoint works with proper authentication."""
-        # Monkeypatch storage_path at the module level where it's actually used
-        import app.models.uploads
-        monkeypatch.setattr(app.models.uploads.config, "storage_path", tmp_path)
-
         # Create user and upload
         user = await User.create(
-            username="authuser",
+            username="downloaduser",
             email="auth@example.com",
             password="password",
             fingerprint_hash="fp-hash",
         )
 
         # Authenticate user
-        token = create_access_token({"sub": user.username})
-        client.cookies = {"access_token": token}
+        client.cookies = {"access_token": DOWNLOAD_TOKEN}
 
         # Create test file
-        test_file = tmp_path / f"user_{user.id}" / "auth_test.txt"
+        test_file = storage_path / f"user_{user.id}" / "auth_test.txt"
         test_file.parent.mkdir(parents=True, exist_ok=True)
         test_file.write_text("auth test content")
 
@@ -586,79 +436,32 @@ class TestUploadIntegration:
     """Test integration between UI endpoints and upload handler."""
 
     @pytest.mark.asyncio
-    async def test_both_endpoints_delegate_to_handler(self, client, monkeypatch):
-        """Test that both GET and POST endpoints use same handler logic."""
-        # Setup mock to verify handler is called
-        handler_called = {"count": 0}
-        
-        async def mock_handle_uploaded_files(user, files):
-            handler_called["count"] += 1
-            return [
-                UploadResult(
-                    status="success",
-                    message="",
-                    upload_id=1,
-                    metadata=UploadMetadata(
-                        user_id=user.id,
-                        filename="test_20250125-120000_abcd1234",
-                        ext="txt",
-                        original_filename="test.txt",
-                        clean_filename="test",
-                        size=7,
-                        mime_type="text/plain",
-                    ),
-                )
-            ]
-        
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        # POST endpoint should call handler
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("test.txt", BytesIO(b"content"), "text/plain")},
+    async def test_both_endpoints_delegate_to_handler(self, client, test_user, mock_upload_handler, monkeypatch, access_token_for):
+        """Test that the UI and API upload endpoints both pass the posted files to handle_uploaded_files."""
+        handler_calls = mock_upload_handler(lambda user, files: [_success_result(user.id)])
+        # Route the API endpoint through the same recording stub
+        monkeypatch.setattr(api_uploads, "handle_uploaded_files", ui_uploads.handle_uploaded_files)
+        
+        ui_response = await client.post("/upload", **SINGLE_FILE_POST)
+        api_response = await client.post(
+            "/api/v1/uploads",
+            content=SINGLE_FILE_POST["content"],
+            headers={**SINGLE_FILE_POST["headers"], "Authorization": f"Bearer {access_token_for(test_user.username)}"},
         )
         
-        assert response.status_code == 200
-        assert handler_called["count"] >= 1
+        assert ui_response.status_code == 200
+        assert api_response.status_code == 200
+        assert len(handler_calls) == 2
+        assert [files[0].filename for _, files in handler_calls] == ["test.txt", "test.txt"]
+        assert api_response.json()["results"][0]["status"] == "success"
 
     @pytest.mark.asyncio
-    async def test_upload_lists_successful_files(self, client, monkeypatch):
+    async def test_upload_lists_successful_files(self, client, test_user, mock_upload_handler):
         """Test that successful uploads are listed in response."""
-        user = await User.create(
-            username="testuser",
-            email="test@example.com",
-            password="hashedpassword",
-            is_registered=True,
-        )
+        mock_upload_handler(lambda user, files: [_success_result(user.id, "important.txt")])
         
-        async def mock_handle_uploaded_files(user, files):
-            return [
-                UploadResult(
-                    status="success",
-                    message="",
-                    upload_id=1,
-                    metadata=UploadMetadata(
-                        user_id=user.id,
-                        filename="test_20250125-120000_abcd1234",
-                        ext="txt",
-                        original_filename="important.txt",
-                        clean_filename="important",
-                        size=7,
-                        mime_type="text/plain",
-                    ),
-                )
-            ]
+        response = await client.post("/upload", **IMPORTANT_FILE_POST)
         
-        import app.ui.uploads
-        monkeypatch.setattr(app.ui.uploads, "handle_uploaded_files", mock_handle_uploaded_files)
-        
-        response = await client.post(
-            "/upload",
-            files={"upload_files": ("important.txt", BytesIO(b"content"), "text/plain")},
-        )
-        
-        html = response.text
-        
-        # Should mention the filename
-        assert "important" in html.lower() or "test" in html.lower()
+        # Should list the uploaded file's original name
+        assert response.status_code == 200
+        assert "important.txt" in response.text
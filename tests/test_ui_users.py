@@ -1,124 +1,96 @@
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
 from app.models.users import User
 from app.models.uploads import Upload
 from app.lib.auth import create_access_token
+from app.models.common.pagination import MAX_PAGE_SIZE
+
+
+# Token for the "testuser" account, signed once at import rather than in every test
+ACCESS_TOKEN = create_access_token(data={"sub": "testuser"})
+
+
+@pytest.fixture
+async def authed_user(client):
+    """Create the registered "testuser" and log the shared client in as them."""
+    user = await User.create(username="testuser", email="test@example.com", is_registered=True, password="password")
+    client.cookies = {"access_token": ACCESS_TOKEN}
+    return user
+
+
+@pytest.fixture
+def profile_mocks(client, monkeypatch):
+    """Log the shared client in as an unsaved "testuser" and stub out the profile page's upload queries.
+
+    Returns the `(mock_paginate, mock_pages)` stand-ins of `Upload.paginate` and `Upload.pages`.
+    """
+    # Authenticate as an unsaved User, which passes the auth isinstance checks without a spec'd mock
+    user = User(id=1, username="testuser", is_registered=True)
+    
+    async def mock_get_or_none(**kwargs):
+        if kwargs.get("username") == "testuser":
+            return user
+        return None
+    
+    monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
+    
+    client.cookies = {"access_token": ACCESS_TOKEN}
+    
+    # Mock Upload.paginate and Upload.pages to avoid DB queries and check arguments
+    mock_paginate = MagicMock()
+    mock_pages = AsyncMock(return_value=1)
+    
+    # await Upload.paginate(...).all().prefetch_related("images") resolves to no uploads
+    mock_paginate.return_value.all.return_value.prefetch_related = AsyncMock(return_value=[])
+    
+    monkeypatch.setattr(Upload, "paginate", mock_paginate)
+    monkeypatch.setattr(Upload, "pages", mock_pages)
+    
+    return mock_paginate, mock_pages
+
 
 class TestUserProfileEndpoint:
     """Test GET /profile endpoint."""
 
     @pytest.mark.asyncio
-    async def test_profile_page_default_sorting(self, client, monkeypatch):
-        """Test that profile page uses created_at desc sorting by default."""
-        
-        # Create and authenticate a user
-        mock_user = MagicMock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        mock_user.is_registered = True
-        mock_user.max_uploads_count = -1  # Unlimited
-        mock_user.uploads_count = AsyncMock(return_value=0)
-        
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        
-        token = create_access_token({"sub": "testuser"})
-        client.cookies = {"access_token": token}
-        
-        # Mock Upload.paginate and Upload.pages to avoid DB queries and check arguments
-        with patch("app.models.uploads.Upload.paginate") as mock_paginate, \
-             patch("app.models.uploads.Upload.pages", new_callable=AsyncMock) as mock_pages:
-            
-            # Set up the mock chain for paginate
-            # await Upload.paginate(...).all().prefetch_related("images")
-            mock_qs_after_paginate = MagicMock()
-            mock_qs_after_all = MagicMock()
-            
-            # Create a real coroutine to return
-            async def get_results():
-                return []
-                
-            mock_paginate.return_value = mock_qs_after_paginate
-            mock_qs_after_paginate.all.return_value = mock_qs_after_all
-            mock_qs_after_all.prefetch_related.return_value = get_results()
-            
-            mock_pages.return_value = 1
-            
-            # Make request
-            response = await client.get("/profile")
-            
-            assert response.status_code == 200
-            
-            # Verify default sorting was applied
-            call_kwargs = mock_paginate.call_args[1]
-            assert call_kwargs.get("sort_by") == "created_at"
-            assert call_kwargs.get("sort_order") == "desc"
+    @pytest.mark.parametrize("url,expected", [
+        ("/profile", {"sort_by": "created_at", "sort_order": "desc"}),
+        ("/profile?sort_by=size&sort_order=asc", {"sort_by": "size", "sort_order": "asc"}),
+    ], ids=["default", "explicit"])
+    async def test_profile_page_sorting(self, client, profile_mocks, url, expected):
+        """Test that profile page sorts by created_at desc by default and respects explicit sorting parameters."""
+        mock_paginate, mock_pages = profile_mocks
+        
+        response = await client.get(url)
+        
+        assert response.status_code == 200
+        
+        # Verify the sorting passed to paginate
+        call_kwargs = mock_paginate.call_args.kwargs
+        assert {key: call_kwargs.get(key) for key in expected} == expected
 
     @pytest.mark.asyncio
-    async def test_profile_page_explicit_sorting(self, client, monkeypatch):
-        """Test that profile page respects explicit sorting parameters."""
-        
-        # Create and authenticate a user
-        mock_user = MagicMock(spec=User)
-        mock_user.id = 1
-        mock_user.username = "testuser"
-        mock_user.is_registered = True
-        mock_user.max_uploads_count = -1  # Unlimited
-        mock_user.uploads_count = AsyncMock(return_value=0)
-        
-        async def mock_get_or_none(**kwargs):
-            if kwargs.get("username") == "testuser":
-                return mock_user
-            return None
-        
-        monkeypatch.setattr(User, "get_or_none", mock_get_or_none)
-        
-        token = create_access_token({"sub": "testuser"})
-        client.cookies = {"access_token": token}
-        
-        with patch("app.models.uploads.Upload.paginate") as mock_paginate, \
-             patch("app.models.uploads.Upload.pages", new_callable=AsyncMock) as mock_pages:
-            
-            mock_qs_after_paginate = MagicMock()
-            mock_qs_after_all = MagicMock()
-            
-            async def get_results():
-                return []
-            
-            mock_paginate.return_value = mock_qs_after_paginate
-            mock_qs_after_paginate.all.return_value = mock_qs_after_all
-            mock_qs_after_all.prefetch_related.return_value = get_results()
-            
-            mock_pages.return_value = 1
-            
-            # Make request with explicit sorting
-            response = await client.get("/profile?sort_by=size&sort_order=asc")
-            
-            assert response.status_code == 200
-            
-            # Verify explicit sorting was applied
-            call_kwargs = mock_paginate.call_args[1]
-            assert call_kwargs.get("sort_by") == "size"
-            assert call_kwargs.get("sort_order") == "asc"
+    @pytest.mark.parametrize("query", ["page=0", "page_size=0", f"page_size={MAX_PAGE_SIZE + 1}"])
+    async def test_profile_page_rejects_out_of_range_pagination(self, client, profile_mocks, query):
+        """Test that profile page rejects pages below 1 and page sizes outside 1..MAX_PAGE_SIZE."""
+        mock_paginate, mock_pages = profile_mocks
+        
+        response = await client.get(f"/profile?{query}")
+        
+        assert response.status_code == 422
+        mock_paginate.assert_not_called()
 
 
 class TestUserProfileIntegration:
     """Integration tests for user profile page rendering."""
 
     @pytest.mark.asyncio
-    async def test_profile_empty_state(self, client):
+    async def test_profile_empty_state(self, client, authed_user):
         """Test profile page with no uploads."""
-        # Create user but no uploads
-        user = await User.create(username="testuser", email="test@example.com", is_registered=True, password="password")
-        
-        # Authenticate
-        token = create_access_token({"sub": user.username})
-        client.cookies = {"access_token": token}
+        # User exists but has no uploads
+        user = authed_user
         
         response = await client.get("/profile")
         assert response.status_code == 200
@@ -131,13 +103,9 @@ class TestUserProfileIntegration:
         assert "Filename:" not in html
 
     @pytest.mark.asyncio
-    async def test_profile_renders_uploads(self, client):
+    async def test_profile_renders_uploads(self, client, authed_user):
         """Test rendering of mixed upload types (image vs file)."""
-        user = await User.create(username="gallery_user", email="gallery@example.com", is_registered=True, password="password")
-        
-        # Authenticate
-        token = create_access_token({"sub": user.username})
-        client.cookies = {"access_token": token}
+        user = authed_user
         
         # Create non-image upload
         text_upload = await Upload.create(
@@ -193,17 +161,14 @@ class TestUserProfileIntegration:
         assert f'src="{image_upload.url}"' in html
 
     @pytest.mark.asyncio
-    async def test_profile_pagination_integration(self, client):
+    async def test_profile_pagination_integration(self, client, authed_user):
         """Test that profile lists uploads and respects existing pagination logic."""
-        user = await User.create(username="paged_user", email="paged@example.com", is_registered=True, password="password")
+        user = authed_user
         
-        # Authenticate
-        token = create_access_token({"sub": user.username})
-        client.cookies = {"access_token": token}
-        
-        # Create 15 uploads
-        for i in range(15):
-             await Upload.create(
+        # Create 15 uploads in one INSERT, a second apart so the newest-first order is unambiguous
+        created_at = datetime.now(timezone.utc)
+        await Upload.bulk_create([
+            Upload(
                 user=user,
                 description=f"File {i}",
                 name=f"file{i}",
@@ -212,9 +177,12 @@ class TestUserProfileIntegration:
                 ext="txt",
                 size=100,
                 type="text/plain",
-                extra=""
+                extra="",
+                created_at=created_at + timedelta(seconds=i),
             )
-            
+            for i in range(15)
+        ])
+        
         response = await client.get("/profile")
         assert response.status_code == 200
         html = response.text